@@ -0,0 +1,124 @@
+"""
+Database Migration: Add composite (user_id, timestamp) index to log_entries
+
+Every dashboard, analytics and export query filters log entries by user and
+timestamp range and orders by timestamp. The composite index lets SQLite
+answer both the WHERE and the ORDER BY from one index range scan instead of
+filtering and then sorting in a temporary B-tree.
+
+New databases get the index from db.create_all(); run this once against an
+existing database.
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+import shutil
+
+# Database path
+DB_PATH = 'instance/pancrepal.db'
+
+INDEX_NAME = 'ix_log_entries_user_timestamp'
+
+
+def backup_database():
+    """Create timestamped backup of database before migration."""
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Database not found at {DB_PATH}")
+        print("   This is normal for new installations.")
+        return False
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_path = f'pancrepal_backup_{timestamp}.db'
+
+    try:
+        shutil.copy2(DB_PATH, backup_path)
+        print(f"✅ Backup created: {backup_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Backup failed: {e}")
+        return False
+
+
+def check_index_exists(cursor):
+    """Check if the composite index already exists."""
+    cursor.execute("PRAGMA index_list(log_entries)")
+    return any(row[1] == INDEX_NAME for row in cursor.fetchall())
+
+
+def add_user_timestamp_index():
+    """Create the composite index on log_entries(user_id, timestamp)."""
+    if not os.path.exists(DB_PATH):
+        print("ℹ️  No existing database found. Index will be created on first app run.")
+        return True
+
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+
+        if check_index_exists(cursor):
+            print(f"ℹ️  Index '{INDEX_NAME}' already exists. No migration needed.")
+            conn.close()
+            return True
+
+        print(f"🔄 Creating {INDEX_NAME} on log_entries(user_id, timestamp)...")
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS {INDEX_NAME}
+            ON log_entries (user_id, timestamp)
+        """)
+        cursor.execute("ANALYZE log_entries")
+        conn.commit()
+
+        if check_index_exists(cursor):
+            print("✅ Index created successfully!")
+        else:
+            print("❌ Index creation failed - verification unsuccessful")
+            conn.close()
+            return False
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+
+def main():
+    """Run migration with backup."""
+    print("=" * 60)
+    print("PancrePal Database Migration - log_entries (user_id, timestamp) index")
+    print("=" * 60)
+    print()
+
+    print("Step 1: Creating backup...")
+    backup_created = backup_database()
+    print()
+
+    print("Step 2: Creating index...")
+    success = add_user_timestamp_index()
+    print()
+
+    print("=" * 60)
+    if success:
+        print("✅ MIGRATION COMPLETED SUCCESSFULLY!")
+        if backup_created:
+            print()
+            print("💾 Backup available for rollback if needed")
+    else:
+        print("❌ MIGRATION FAILED")
+        print()
+        print("Troubleshooting:")
+        print("- Check that pancrepal.db exists")
+        print("- Ensure no other process has the database locked")
+        print("- Review error messages above")
+        if backup_created:
+            print("- Restore from backup if needed")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,11 @@
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from collections import Counter
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, List, Dict, Optional, Sequence, Union
 from db import LogEntry
-import statistics
+import math
+import sys
 
 # ============================================================================
 # GLUCOSE RANGES (mmol/L)
@@ -13,12 +16,195 @@ GLUCOSE_HIGH_THRESHOLD = 11.1
 GLUCOSE_LOW_THRESHOLD = 3.9  # Hypo threshold (below 3.9 = low)
 GLUCOSE_VERY_LOW_THRESHOLD = 3.3
 
+# Integer category codes for the categorical LogEntry fields (see db.py)
+MEAL_CODES = {'breakfast': 0, 'lunch': 1, 'dinner': 2, 'snack': 3, 'none': 4}
+MOOD_CODES = {'happy': 0, 'calm': 1, 'stressed': 2, 'tired': 3, 'frustrated': 4}
+MOOD_STRESSED = MOOD_CODES['stressed']
+
+
+# ============================================================================
+# COLUMNAR ENTRY BATCH
+# ============================================================================
+
+# C-level attribute getters for bulk column extraction
+_TS = attrgetter('timestamp')
+_GLU = attrgetter('blood_glucose')
+_CARB = attrgetter('carbs_grams')
+_MEAL = attrgetter('meal_type')
+_MOOD = attrgetter('mood')
+_HOUR = attrgetter('hour')
+
+
+@dataclass
+class LogBatch:
+    """
+    Column-oriented (structure-of-arrays) view of a list of log entries.
+
+    Each field is a plain list holding one attribute of every entry, in the
+    original order. Build it once per request with LogBatch.from_entries()
+    and pass it to the analytics functions, so the ORM attribute lookups
+    happen once per entry instead of once per entry per function.
+
+    Meal type and mood are stored as integer codes (MEAL_CODES/MOOD_CODES);
+    ``*_categories[code]`` maps a code back to its name. Values outside the
+    known set get the next free code for this batch.
+    """
+    entries: Sequence
+    timestamp: List[datetime]
+    glucose: List[float]
+    carbs: List[Optional[int]]
+    hour: List[int]
+    date_ord: List[int]
+    meal_code: List[int]
+    meal_categories: List[str]
+    mood_code: List[int]
+    mood_categories: List[str]
+
+    @classmethod
+    def from_entries(cls, entries) -> 'LogBatch':
+        """Build a batch from LogEntry objects (a LogBatch is returned as-is)."""
+        if isinstance(entries, cls):
+            return entries
+        timestamps = list(map(_TS, entries))
+        meal_codes = dict(MEAL_CODES)
+        mood_codes = dict(MOOD_CODES)
+        meal_code = [meal_codes.setdefault(m, len(meal_codes)) for m in map(_MEAL, entries)]
+        mood_code = [mood_codes.setdefault(m, len(mood_codes)) for m in map(_MOOD, entries)]
+        return cls(
+            entries=entries,
+            timestamp=timestamps,
+            glucose=list(map(_GLU, entries)),
+            carbs=list(map(_CARB, entries)),
+            hour=list(map(_HOUR, timestamps)),
+            date_ord=list(map(datetime.toordinal, timestamps)),
+            meal_code=meal_code,
+            meal_categories=list(meal_codes),
+            mood_code=mood_code,
+            mood_categories=list(mood_codes),
+        )
+
+    def __len__(self) -> int:
+        return len(self.glucose)
+
+
+# Every analytics function accepts either raw entries or a prebuilt batch
+Entries = Union[List[LogEntry], LogBatch]
+
+
+# ============================================================================
+# SHARED REDUCTION KERNEL
+# ============================================================================
+
+def _glucose_stats(values: Sequence[float], lo: float = GLUCOSE_TARGET_MIN,
+                   hi: float = GLUCOSE_TARGET_MAX, hypo_threshold: float = GLUCOSE_LOW_THRESHOLD) -> tuple:
+    """
+    Reduce a sequence of glucose readings in one pass.
+
+    Each reading is split into an exact integer ratio. Float denominators
+    are powers of two, so the sum and the sum of squares stay exact as
+    integers over one shared (growing) denominator. The mean is then a
+    single int / int division and the sample standard deviation the
+    correctly rounded square root of the exact variance, matching
+    statistics.mean and statistics.stdev even at x.x5 display ties. The
+    in-range, hypo and hyper counts are taken in the same loop by adding
+    the comparison results directly (bools add as 0/1). Thresholds are
+    parameters so the loop only touches local variables.
+
+    Returns:
+        (count, mean, std_dev, in_range, hypos, hypers); std_dev is 0 for
+        fewer than two readings
+    """
+    n = 0
+    denominator = 1
+    total = 0
+    total_sq = 0
+    in_range = 0
+    hypos = 0
+    hypers = 0
+    for g in values:
+        numerator, d = g.as_integer_ratio()
+        if d > denominator:
+            scale = d // denominator
+            total *= scale
+            total_sq *= scale * scale
+            denominator = d
+        else:
+            numerator *= denominator // d
+        n += 1
+        total += numerator
+        total_sq += numerator * numerator
+        in_range += lo <= g <= hi
+        hypos += g < hypo_threshold
+        hypers += g > hi
+
+    if not n:
+        return 0, 0.0, 0, in_range, hypos, hypers
+
+    mean = total / (denominator * n)
+    if n > 1:
+        # Sample variance (n*sum(x^2) - sum(x)^2) / (n*(n-1)) over denominator^2
+        std_dev = _sqrt_of_frac(n * total_sq - total * total,
+                                n * (n - 1) * denominator * denominator)
+    else:
+        std_dev = 0
+    return n, mean, std_dev, in_range, hypos, hypers
+
+
+# Extra precision for _sqrt_of_frac: twice the float mantissa plus guard bits
+_SQRT_BIT_WIDTH = 2 * sys.float_info.mant_dig + 3
+
+
+def _sqrt_of_frac(n: int, m: int) -> float:
+    """
+    Square root of n/m as a correctly rounded float.
+
+    Same method as statistics.stdev: take an integer square root with
+    enough extra bits, round-to-odd, and let the final int / int division
+    round once. math.sqrt(n / m) would round twice.
+    """
+    q = (n.bit_length() - m.bit_length() - _SQRT_BIT_WIDTH) // 2
+    if q >= 0:
+        return float(_isqrt_rto(n, m << 2 * q) << q)
+    return _isqrt_rto(n << -2 * q, m) / (1 << -q)
+
+
+def _isqrt_rto(n: int, m: int) -> int:
+    """Integer square root of n/m, rounded to odd."""
+    a = math.isqrt(n // m)
+    return a | (a * a * m != n)
+
+
+# ============================================================================
+# STATUS CLASSIFICATION
+# ============================================================================
+
+# (status, trend, weekly message, weekly icon), best first.
+# Shared by calculate_advanced_metrics() and analyze_weekly_trend().
+_STATUS_TABLE = (
+    ('excellent', 'improving',
+     '🌟 Amazing work this week! Your glucose levels show great consistency.', '🎉'),
+    ('good', 'stable',
+     "💪 You're doing well! Keep up the steady progress.", '✨'),
+    ('needs_attention', 'needs_attention',
+     "🤗 We see you're working on it. Every log helps you understand patterns better!", '💙'),
+)
+_STATUS_BY_NAME = {row[0]: row for row in _STATUS_TABLE}
+
+
+def _status_index(time_in_range_pct: float, coefficient_of_variation: float) -> int:
+    """Row of _STATUS_TABLE for the given time-in-range and variability."""
+    if time_in_range_pct >= 70 and coefficient_of_variation < 36:
+        return 0
+    if time_in_range_pct >= 50 and coefficient_of_variation < 50:
+        return 1
+    return 2
+
 
 # ============================================================================
 # US-23: ADVANCED ANALYTICS & METRICS (unchanged from Iteration 5)
 # ============================================================================
 
-def calculate_advanced_metrics(entries: List[LogEntry]) -> Dict:
+def calculate_advanced_metrics(entries: Entries) -> Dict:
     """
     Calculate comprehensive glucose metrics for professional reporting.
 
@@ -30,117 +216,143 @@ def calculate_advanced_metrics(entries: List[LogEntry]) -> Dict:
     - Coefficient of variation
     - Average daily carbs (if tracking enabled)
     """
+    return format_metrics(_raw_metrics(entries))
+
+
+def _raw_metrics(entries: Entries) -> Optional[Dict]:
+    """
+    Unrounded metrics behind calculate_advanced_metrics(), or None when
+    there are no entries. Rounding is left to format_metrics() so callers
+    that do further arithmetic work from the exact values.
+    """
     if not entries:
-        return {
-            'status': 'no_data',
-            'message': 'No data available for analysis'
-        }
+        return None
 
-    glucose_values = [e.blood_glucose for e in entries]
-    total_readings = len(glucose_values)
+    batch = LogBatch.from_entries(entries)
+    total_readings, mean_glucose, std_dev, in_range_count, hypo_frequency, hyper_frequency = \
+        _glucose_stats(batch.glucose)
 
-    mean_glucose = statistics.mean(glucose_values)
+    total_carbs = 0
+    carb_count = 0
+    carb_dates = set()
+    for carbs, day in zip(batch.carbs, batch.date_ord):
+        if carbs is not None:
+            total_carbs += carbs
+            carb_count += 1
+            carb_dates.add(day)
 
-    if len(glucose_values) > 1:
-        std_dev = statistics.stdev(glucose_values)
+    if total_readings > 1:
         coefficient_of_variation = (std_dev / mean_glucose) * 100 if mean_glucose > 0 else 0
     else:
-        std_dev = 0
         coefficient_of_variation = 0
 
-    in_range = [g for g in glucose_values if GLUCOSE_TARGET_MIN <= g <= GLUCOSE_TARGET_MAX]
-    time_in_range_pct = (len(in_range) / total_readings) * 100
-
-    hypos = [g for g in glucose_values if g < GLUCOSE_LOW_THRESHOLD]
-    hypo_frequency = len(hypos)
-    hypo_percentage = (hypo_frequency / total_readings) * 100
-
-    hypers = [g for g in glucose_values if g > GLUCOSE_TARGET_MAX]
-    hyper_frequency = len(hypers)
-    hyper_percentage = (hyper_frequency / total_readings) * 100
+    time_in_range_pct = (in_range_count / total_readings) * 100
 
-    entries_with_carbs = [e for e in entries if e.carbs_grams is not None]
-    if entries_with_carbs:
-        total_carbs = sum(e.carbs_grams for e in entries_with_carbs)
-        avg_carbs_per_entry = total_carbs / len(entries_with_carbs)
-        unique_dates = set(e.timestamp.date() for e in entries_with_carbs)
-        avg_daily_carbs = total_carbs / len(unique_dates) if unique_dates else 0
+    if carb_count:
+        avg_carbs_per_entry = total_carbs / carb_count
+        avg_daily_carbs = total_carbs / len(carb_dates)
     else:
         avg_carbs_per_entry = None
         avg_daily_carbs = None
-        total_carbs = 0
 
-    if time_in_range_pct >= 70 and coefficient_of_variation < 36:
-        status = 'excellent'
-        trend = 'improving'
-    elif time_in_range_pct >= 50 and coefficient_of_variation < 50:
-        status = 'good'
-        trend = 'stable'
-    else:
-        status = 'needs_attention'
-        trend = 'needs_attention'
+    status, trend = _STATUS_TABLE[_status_index(time_in_range_pct, coefficient_of_variation)][:2]
 
     return {
         'status': status,
         'trend': trend,
-        'mean_glucose': round(mean_glucose, 1),
-        'std_dev': round(std_dev, 1),
-        'coefficient_of_variation': round(coefficient_of_variation, 1),
-        'time_in_range_pct': round(time_in_range_pct, 1),
-        'time_below_range_pct': round(hypo_percentage, 1),
-        'time_above_range_pct': round(hyper_percentage, 1),
+        'mean_glucose': mean_glucose,
+        'std_dev': std_dev,
+        'coefficient_of_variation': coefficient_of_variation,
+        'time_in_range_pct': time_in_range_pct,
+        'time_below_range_pct': (hypo_frequency / total_readings) * 100,
+        'time_above_range_pct': (hyper_frequency / total_readings) * 100,
         'total_readings': total_readings,
         'hypo_events': hypo_frequency,
         'hyper_events': hyper_frequency,
-        'avg_carbs_per_entry': round(avg_carbs_per_entry, 1) if avg_carbs_per_entry else None,
-        'avg_daily_carbs': round(avg_daily_carbs, 1) if avg_daily_carbs else None,
+        'avg_carbs_per_entry': avg_carbs_per_entry,
+        'avg_daily_carbs': avg_daily_carbs,
         'total_carbs': total_carbs,
-        'entries_with_carbs': len(entries_with_carbs)
+        'entries_with_carbs': carb_count
     }
 
 
-def get_metric_explanation(metric_name: str) -> Dict:
-    """Get user-friendly explanation for each metric."""
-    explanations = {
-        'time_in_range': {
-            'title': 'Time in Range',
-            'description': 'Percentage of readings between 3.9-10.0 mmol/L. This is the most important metric for diabetes management.',
-            'target': '70% or higher',
-            'icon': '🎯'
-        },
-        'coefficient_of_variation': {
-            'title': 'Glucose Variability',
-            'description': 'Measures how much your glucose levels fluctuate. Lower is better - it means more stable control.',
-            'target': 'Below 36%',
-            'icon': '📊'
-        },
-        'hypo_events': {
-            'title': 'Low Glucose Events',
-            'description': 'Number of readings below 3.9 mmol/L. Important to minimize these for safety.',
-            'target': 'Less than 4% of readings',
-            'icon': '⚠️'
-        },
-        'hyper_events': {
-            'title': 'High Glucose Events',
-            'description': 'Number of readings above 10.0 mmol/L. Reducing these improves long-term health outcomes.',
-            'target': 'Less than 25% of readings',
-            'icon': '📈'
-        },
-        'avg_glucose': {
-            'title': 'Average Glucose',
-            'description': "Your mean blood glucose level. Useful but doesn't show the full picture - variability matters too!",
-            'target': '6.0-8.0 mmol/L',
-            'icon': '📉'
-        },
-        'avg_daily_carbs': {
-            'title': 'Average Daily Carbs',
-            'description': 'How many grams of carbohydrates you consume per day on average. Helps plan insulin doses.',
-            'target': 'Varies by individual',
-            'icon': '🥖'
+# Float statistics rounded to 1 d.p. for display; the carb averages are
+# rounded too but stay None when carbs aren't tracked.
+_ROUNDED_METRICS = ('mean_glucose', 'std_dev', 'coefficient_of_variation', 'time_in_range_pct',
+                    'time_below_range_pct', 'time_above_range_pct')
+_OPTIONAL_ROUNDED_METRICS = ('avg_carbs_per_entry', 'avg_daily_carbs')
+
+
+def format_metrics(raw: Optional[Dict]) -> Dict:
+    """
+    Round raw metrics for display and serialisation.
+
+    Args:
+        raw: Dict from _raw_metrics(), or None when there was no data
+
+    Returns:
+        The calculate_advanced_metrics() dictionary
+    """
+    if raw is None:
+        return {
+            'status': 'no_data',
+            'message': 'No data available for analysis'
         }
+
+    metrics = dict(raw)
+    for key in _ROUNDED_METRICS:
+        metrics[key] = round(raw[key], 1)
+    for key in _OPTIONAL_ROUNDED_METRICS:
+        value = raw[key]
+        metrics[key] = round(value, 1) if value else None
+    return metrics
+
+
+# User-friendly explanation for each metric, built once at import.
+# Shared with every render: treat as read-only.
+METRIC_EXPLANATIONS = {
+    'time_in_range': {
+        'title': 'Time in Range',
+        'description': 'Percentage of readings between 3.9-10.0 mmol/L. This is the most important metric for diabetes management.',
+        'target': '70% or higher',
+        'icon': '🎯'
+    },
+    'coefficient_of_variation': {
+        'title': 'Glucose Variability',
+        'description': 'Measures how much your glucose levels fluctuate. Lower is better - it means more stable control.',
+        'target': 'Below 36%',
+        'icon': '📊'
+    },
+    'hypo_events': {
+        'title': 'Low Glucose Events',
+        'description': 'Number of readings below 3.9 mmol/L. Important to minimize these for safety.',
+        'target': 'Less than 4% of readings',
+        'icon': '⚠️'
+    },
+    'hyper_events': {
+        'title': 'High Glucose Events',
+        'description': 'Number of readings above 10.0 mmol/L. Reducing these improves long-term health outcomes.',
+        'target': 'Less than 25% of readings',
+        'icon': '📈'
+    },
+    'avg_glucose': {
+        'title': 'Average Glucose',
+        'description': "Your mean blood glucose level. Useful but doesn't show the full picture - variability matters too!",
+        'target': '6.0-8.0 mmol/L',
+        'icon': '📉'
+    },
+    'avg_daily_carbs': {
+        'title': 'Average Daily Carbs',
+        'description': 'How many grams of carbohydrates you consume per day on average. Helps plan insulin doses.',
+        'target': 'Varies by individual',
+        'icon': '🥖'
     }
+}
+
 
-    return explanations.get(metric_name, {
+def get_metric_explanation(metric_name: str) -> Dict:
+    """Get user-friendly explanation for each metric."""
+    return METRIC_EXPLANATIONS.get(metric_name, {
         'title': metric_name.replace('_', ' ').title(),
         'description': 'Track this metric to understand your diabetes management.',
         'target': 'Consult your healthcare team',
@@ -152,7 +364,7 @@ def get_metric_explanation(metric_name: str) -> Dict:
 # EXISTING ANALYTICS FUNCTIONS (unchanged from Iteration 5)
 # ============================================================================
 
-def analyze_weekly_trend(entries: List[LogEntry]) -> Dict:
+def analyze_weekly_trend(entries: Entries) -> Dict:
     """Analyze glucose patterns over the past week."""
     if not entries:
         return {
@@ -161,51 +373,120 @@ def analyze_weekly_trend(entries: List[LogEntry]) -> Dict:
             'icon': '📊'
         }
 
-    metrics = calculate_advanced_metrics(entries)
+    raw = _raw_metrics(entries)
 
-    if metrics['status'] == 'excellent':
-        message = '🌟 Amazing work this week! Your glucose levels show great consistency.'
-        icon = '🎉'
-    elif metrics['status'] == 'good':
-        message = "💪 You're doing well! Keep up the steady progress."
-        icon = '✨'
-    else:
-        message = "🤗 We see you're working on it. Every log helps you understand patterns better!"
-        icon = '💙'
+    message, icon = _STATUS_BY_NAME[raw['status']][2:]
 
+    # Only the three figures shown here are rounded
     return {
-        'status': metrics['status'],
+        'status': raw['status'],
         'message': message,
         'icon': icon,
-        'time_in_range': metrics['time_in_range_pct'],
-        'avg_glucose': metrics['mean_glucose'],
-        'consistency': 100 - min(metrics['coefficient_of_variation'], 100)
+        'time_in_range': round(raw['time_in_range_pct'], 1),
+        'avg_glucose': round(raw['mean_glucose'], 1),
+        'consistency': 100 - min(round(raw['coefficient_of_variation'], 1), 100)
     }
 
 
-def identify_recurring_patterns(entries: List[LogEntry]) -> List[Dict]:
+@dataclass
+class PatternCounts:
+    """
+    Tallies shared by identify_recurring_patterns() and
+    generate_weekly_suggestion(), built in one pass by
+    precompute_pattern_counts().
+
+    ``meal_groups`` maps a meal code to
+    [count, glucose_sum, high_count, low_count, carb_sum, carb_count],
+    in first-seen order (which decides which patterns survive the cap).
+    """
+    total: int
+    meal_groups: Dict[int, list]
+    carb_count: int
+    morning_count: int
+    evening_count: int
+    evening_glucose_sum: float
+    evening_carb_sum: int
+    evening_carb_count: int
+    stressed_highs: int
+
+
+def precompute_pattern_counts(batch: LogBatch) -> PatternCounts:
+    """
+    Scan a batch once for everything the pattern and suggestion rules need.
+
+    The dashboard computes this once and passes it to both functions.
+    """
+    # Constants are bound to locals so the loop avoids global lookups.
+    high_threshold = GLUCOSE_HIGH_THRESHOLD
+    very_low_threshold = GLUCOSE_VERY_LOW_THRESHOLD
+    stressed = MOOD_STRESSED
+    meal_groups: Dict[int, list] = {}
+    carb_count = 0
+    morning_count = 0
+    evening_count = 0
+    evening_glucose_sum = 0.0
+    evening_carb_sum = 0
+    evening_carb_count = 0
+    stressed_highs = 0
+    for code, h, g, c, mood in zip(batch.meal_code, batch.hour, batch.glucose,
+                                   batch.carbs, batch.mood_code):
+        acc = meal_groups.get(code)
+        if acc is None:
+            acc = meal_groups[code] = [0, 0.0, 0, 0, 0, 0]
+        acc[0] += 1
+        acc[1] += g
+        if g > high_threshold:
+            acc[2] += 1
+            if mood == stressed:
+                stressed_highs += 1
+        elif g < very_low_threshold:
+            acc[3] += 1
+        if c is not None:
+            acc[4] += c
+            acc[5] += 1
+            carb_count += 1
+        if 5 <= h < 12:
+            morning_count += 1
+        elif 18 <= h < 23:
+            evening_count += 1
+            evening_glucose_sum += g
+            if c is not None:
+                evening_carb_sum += c
+                evening_carb_count += 1
+
+    return PatternCounts(
+        total=len(batch),
+        meal_groups=meal_groups,
+        carb_count=carb_count,
+        morning_count=morning_count,
+        evening_count=evening_count,
+        evening_glucose_sum=evening_glucose_sum,
+        evening_carb_sum=evening_carb_sum,
+        evening_carb_count=evening_carb_count,
+        stressed_highs=stressed_highs,
+    )
+
+
+def identify_recurring_patterns(entries: Entries, counts: Optional[PatternCounts] = None) -> List[Dict]:
     """Identify recurring high or low glucose patterns by time and meal type."""
     if len(entries) < 3:
         return []
 
+    batch = LogBatch.from_entries(entries)
+    if counts is None:
+        counts = precompute_pattern_counts(batch)
     patterns = []
 
-    meal_groups = defaultdict(list)
-    for entry in entries:
-        meal_groups[entry.meal_type].append(entry)
-
-    for meal_type, meal_entries in meal_groups.items():
-        if len(meal_entries) < 2:
+    for code, (count, glucose_sum, high_count, low_count, carb_sum, carb_count) in counts.meal_groups.items():
+        if count < 2:
             continue
 
-        glucose_values = [e.blood_glucose for e in meal_entries]
-        avg = sum(glucose_values) / len(glucose_values)
-        high_count = sum(1 for g in glucose_values if g > GLUCOSE_HIGH_THRESHOLD)
-        low_count = sum(1 for g in glucose_values if g < GLUCOSE_VERY_LOW_THRESHOLD)
+        meal_type = batch.meal_categories[code]
+
+        avg = glucose_sum / count
 
-        entries_with_carbs = [e for e in meal_entries if e.carbs_grams is not None]
-        if len(entries_with_carbs) >= 2:
-            avg_carbs = sum(e.carbs_grams for e in entries_with_carbs) / len(entries_with_carbs)
+        if carb_count >= 2:
+            avg_carbs = carb_sum / carb_count
             if avg_carbs > 60 and avg > GLUCOSE_HIGH_THRESHOLD:
                 patterns.append({
                     'type': 'high_carb_high_glucose',
@@ -215,14 +496,14 @@ def identify_recurring_patterns(entries: List[LogEntry]) -> List[Dict]:
                 })
                 continue
 
-        if high_count >= len(glucose_values) * 0.6:
+        if high_count >= count * 0.6:
             patterns.append({
                 'type': 'recurring_high',
                 'context': meal_type,
                 'message': f'📈 You often see higher readings after {meal_type}. Consider checking portion sizes or insulin timing.',
                 'severity': 'info'
             })
-        elif low_count >= len(glucose_values) * 0.5:
+        elif low_count >= count * 0.5:
             patterns.append({
                 'type': 'recurring_low',
                 'context': meal_type,
@@ -240,31 +521,27 @@ def identify_recurring_patterns(entries: List[LogEntry]) -> List[Dict]:
     return patterns[:3]
 
 
-def generate_weekly_suggestion(entries: List[LogEntry]) -> Optional[str]:
+def generate_weekly_suggestion(entries: Entries, counts: Optional[PatternCounts] = None) -> Optional[str]:
     """Generate a proactive, actionable suggestion based on weekly patterns."""
     if len(entries) < 5:
         return None
 
-    morning_entries = [e for e in entries if 5 <= e.timestamp.hour < 12]
-    evening_entries = [e for e in entries if 18 <= e.timestamp.hour < 23]
+    if counts is None:
+        counts = precompute_pattern_counts(LogBatch.from_entries(entries))
 
-    entries_with_carbs = [e for e in entries if e.carbs_grams is not None]
-    if len(entries_with_carbs) < len(entries) * 0.3:
+    if counts.carb_count < counts.total * 0.3:
         return "🥖 Try tracking carbs more consistently. It really helps identify patterns!"
 
-    if len(morning_entries) < len(entries) * 0.2:
+    if counts.morning_count < counts.total * 0.2:
         return "💡 Try logging breakfast readings more consistently. Morning data helps spot patterns!"
 
-    if evening_entries:
-        evening_avg = sum(e.blood_glucose for e in evening_entries) / len(evening_entries)
-        evening_with_carbs = [e for e in evening_entries if e.carbs_grams is not None]
-        if evening_with_carbs:
-            evening_avg_carbs = sum(e.carbs_grams for e in evening_with_carbs) / len(evening_with_carbs)
-            if evening_avg > GLUCOSE_HIGH_THRESHOLD and evening_avg_carbs > 70:
-                return "🌙 High carb dinners might be causing evening spikes. Try smaller portions or earlier timing."
+    if counts.evening_count and counts.evening_carb_count:
+        evening_avg = counts.evening_glucose_sum / counts.evening_count
+        evening_avg_carbs = counts.evening_carb_sum / counts.evening_carb_count
+        if evening_avg > GLUCOSE_HIGH_THRESHOLD and evening_avg_carbs > 70:
+            return "🌙 High carb dinners might be causing evening spikes. Try smaller portions or earlier timing."
 
-    stressed_highs = [e for e in entries if e.mood == 'stressed' and e.blood_glucose > GLUCOSE_HIGH_THRESHOLD]
-    if len(stressed_highs) >= 3:
+    if counts.stressed_highs >= 3:
         return "💙 Stress might be affecting your glucose. Try some deep breathing when levels spike!"
 
     return "⭐ You're building great habits! Keep logging to unlock more personalized insights."
@@ -274,44 +551,76 @@ def generate_weekly_suggestion(entries: List[LogEntry]) -> Optional[str]:
 # US-21: EXPORT DATA PREPARATION (unchanged from Iteration 5)
 # ============================================================================
 
-def prepare_export_data(entries: List[LogEntry], days: int = 30) -> Dict:
+def prepare_export_data(entries: Entries, days: int = 30) -> Dict:
     """Prepare comprehensive data for CSV exports."""
     if not entries:
         return {'status': 'no_data'}
 
-    metrics = calculate_advanced_metrics(entries)
+    batch = LogBatch.from_entries(entries)
+    metrics = calculate_advanced_metrics(batch)
 
-    daily_data = defaultdict(list)
-    for entry in entries:
-        date_key = entry.timestamp.date()
-        daily_data[date_key].append(entry)
+    glucose = batch.glucose
+    carbs = batch.carbs
+    date_ord = batch.date_ord
+
+    # Counting sort on the day ordinals: one bucket per day in the
+    # window, filled in entry order, then walked in date order. O(n)
+    # plus the span in days, with no comparison sort.
+    first_day = min(date_ord)
+    buckets = [[] for _ in range(max(date_ord) - first_day + 1)]
+    for i, day_ord in enumerate(date_ord):
+        buckets[day_ord - first_day].append(i)
+    hypo_threshold = GLUCOSE_LOW_THRESHOLD
+    target_max = GLUCOSE_TARGET_MAX
 
     daily_summaries = []
-    for date, day_entries in sorted(daily_data.items()):
-        glucose_vals = [e.blood_glucose for e in day_entries]
-        carb_vals = [e.carbs_grams for e in day_entries if e.carbs_grams is not None]
+    for offset, day_indices in enumerate(buckets):
+        if not day_indices:
+            continue
+        count = 0
+        glucose_sum = 0.0
+        low = math.inf
+        high = -math.inf
+        carb_sum = 0
+        carb_count = 0
+        hypos = 0
+        hypers = 0
+        for i in day_indices:
+            g = glucose[i]
+            count += 1
+            glucose_sum += g
+            if g < low:
+                low = g
+            if g > high:
+                high = g
+            c = carbs[i]
+            if c is not None:
+                carb_sum += c
+                carb_count += 1
+            hypos += g < hypo_threshold
+            hypers += g > target_max
 
         daily_summaries.append({
-            'date': date,
-            'readings': len(day_entries),
-            'avg_glucose': round(sum(glucose_vals) / len(glucose_vals), 1),
-            'min_glucose': round(min(glucose_vals), 1),
-            'max_glucose': round(max(glucose_vals), 1),
-            'total_carbs': sum(carb_vals) if carb_vals else None,
-            'hypo_events': len([g for g in glucose_vals if g < GLUCOSE_LOW_THRESHOLD]),
-            'hyper_events': len([g for g in glucose_vals if g > GLUCOSE_TARGET_MAX])
+            'date': date.fromordinal(first_day + offset),
+            'readings': count,
+            'avg_glucose': round(glucose_sum / count, 1),
+            'min_glucose': round(low, 1),
+            'max_glucose': round(high, 1),
+            'total_carbs': carb_sum if carb_count else None,
+            'hypo_events': hypos,
+            'hyper_events': hypers
         })
 
     return {
         'status': 'success',
         'period_days': days,
         'date_range': {
-            'start': min(e.timestamp.date() for e in entries),
-            'end': max(e.timestamp.date() for e in entries)
+            'start': daily_summaries[0]['date'],
+            'end': daily_summaries[-1]['date']
         },
         'metrics': metrics,
         'daily_summaries': daily_summaries,
-        'entries': entries
+        'entries': batch.entries
     }
 
 
@@ -319,7 +628,30 @@ def prepare_export_data(entries: List[LogEntry], days: int = 30) -> Dict:
 # US-27: TIME-OF-DAY ANALYSIS
 # ============================================================================
 
-def analyze_time_of_day(entries: List[LogEntry]) -> Dict:
+# Display metadata per time-of-day period
+_PERIOD_DEFINITIONS = {
+    'morning':   {'label': 'Morning',   'time_range': '5am – 12pm', 'icon': '🌅',
+                  'chart_color': 'rgba(255, 186, 73, 0.8)'},
+    'afternoon': {'label': 'Afternoon', 'time_range': '12pm – 6pm', 'icon': '☀️',
+                  'chart_color': 'rgba(74, 144, 226, 0.8)'},
+    'evening':   {'label': 'Evening',   'time_range': '6pm – 11pm', 'icon': '🌆',
+                  'chart_color': 'rgba(155, 89, 182, 0.8)'},
+    'night':     {'label': 'Night',     'time_range': '11pm – 5am', 'icon': '🌙',
+                  'chart_color': 'rgba(52, 73, 94, 0.8)'},
+}
+
+# Period index for each hour of the day (0-23), in _PERIOD_KEYS order
+_PERIOD_KEYS = tuple(_PERIOD_DEFINITIONS)
+_HOUR_PERIOD = tuple(
+    0 if 5 <= hour < 12 else
+    1 if 12 <= hour < 18 else
+    2 if 18 <= hour < 23 else
+    3
+    for hour in range(24)
+)
+
+
+def analyze_time_of_day(entries: Entries) -> Dict:
     """
     Categorise entries into morning, afternoon, evening, and night periods,
     then compute key metrics for each period.
@@ -336,39 +668,31 @@ def analyze_time_of_day(entries: List[LogEntry]) -> Dict:
       Night:     23:00 – 04:59
 
     Args:
-        entries: List of LogEntry objects
+        entries: List of LogEntry objects or a LogBatch
 
     Returns:
         Dictionary keyed by period name, each containing metrics
     """
-    period_definitions = {
-        'morning':   {'label': 'Morning',   'time_range': '5am – 12pm', 'icon': '🌅'},
-        'afternoon': {'label': 'Afternoon', 'time_range': '12pm – 6pm', 'icon': '☀️'},
-        'evening':   {'label': 'Evening',   'time_range': '6pm – 11pm', 'icon': '🌆'},
-        'night':     {'label': 'Night',     'time_range': '11pm – 5am', 'icon': '🌙'},
-    }
-
-    # Bucket entries into their period
-    bucketed: Dict[str, list] = {k: [] for k in period_definitions}
-    for entry in entries:
-        hour = entry.timestamp.hour
-        if 5 <= hour < 12:
-            bucketed['morning'].append(entry)
-        elif 12 <= hour < 18:
-            bucketed['afternoon'].append(entry)
-        elif 18 <= hour < 23:
-            bucketed['evening'].append(entry)
-        else:
-            bucketed['night'].append(entry)
+    batch = LogBatch.from_entries(entries)
+    glucose = batch.glucose
+    carbs = batch.carbs
+    target_min = GLUCOSE_TARGET_MIN
+    target_max = GLUCOSE_TARGET_MAX
+    low_threshold = GLUCOSE_LOW_THRESHOLD
+
+    # Bucket entry indices by period through the hour lookup table
+    buckets = [[] for _ in _PERIOD_KEYS]
+    for i, period in enumerate(map(_HOUR_PERIOD.__getitem__, batch.hour)):
+        buckets[period].append(i)
 
     results = {}
-    for period_key, meta in period_definitions.items():
-        period_entries = bucketed[period_key]
+    for period_key, period_indices in zip(_PERIOD_KEYS, buckets):
+        meta = _PERIOD_DEFINITIONS[period_key]
         base = {
             'label': meta['label'],
             'time_range': meta['time_range'],
             'icon': meta['icon'],
-            'count': len(period_entries),
+            'count': len(period_indices),
             'avg_glucose': None,
             'time_in_range_pct': None,
             'hypo_pct': None,
@@ -377,41 +701,69 @@ def analyze_time_of_day(entries: List[LogEntry]) -> Dict:
             'has_data': False,
         }
 
-        if not period_entries:
+        if not period_indices:
             results[period_key] = base
             continue
 
-        glucose_vals = [e.blood_glucose for e in period_entries]
-        n = len(glucose_vals)
-
-        in_range  = [g for g in glucose_vals if GLUCOSE_TARGET_MIN <= g <= GLUCOSE_TARGET_MAX]
-        hypos     = [g for g in glucose_vals if g < GLUCOSE_LOW_THRESHOLD]
-        hypers    = [g for g in glucose_vals if g > GLUCOSE_TARGET_MAX]
-
-        carb_entries = [e for e in period_entries if e.carbs_grams is not None]
-        avg_carbs = (
-            round(sum(e.carbs_grams for e in carb_entries) / len(carb_entries))
-            if carb_entries else None
-        )
+        # One fused pass per period; comparison results add as 0/1
+        glucose_sum = 0.0
+        in_range = 0
+        hypos = 0
+        hypers = 0
+        carb_sum = 0
+        carb_count = 0
+        for i in period_indices:
+            g = glucose[i]
+            glucose_sum += g
+            in_range += target_min <= g <= target_max
+            hypos += g < low_threshold
+            hypers += g > target_max
+            c = carbs[i]
+            if c is not None:
+                carb_sum += c
+                carb_count += 1
+        n = len(period_indices)
 
         results[period_key] = {
             **base,
             'has_data': True,
-            'avg_glucose': round(sum(glucose_vals) / n, 1),
-            'time_in_range_pct': round((len(in_range) / n) * 100, 1),
-            'hypo_pct': round((len(hypos) / n) * 100, 1),
-            'hyper_pct': round((len(hypers) / n) * 100, 1),
-            'avg_carbs': avg_carbs,
+            'avg_glucose': round(glucose_sum / n, 1),
+            'time_in_range_pct': round((in_range / n) * 100, 1),
+            'hypo_pct': round((hypos / n) * 100, 1),
+            'hyper_pct': round((hypers / n) * 100, 1),
+            'avg_carbs': round(carb_sum / carb_count) if carb_count else None,
         }
 
     return results
 
 
+def time_of_day_chart(time_analysis: Dict) -> Dict:
+    """
+    Chart series for the time-of-day TIR bar chart, one bar per period
+    that has data.
+
+    Args:
+        time_analysis: Dict returned by analyze_time_of_day()
+
+    Returns:
+        Dictionary of parallel lists: labels, tir, hypo, hyper, colors
+    """
+    periods = [(key, time_analysis[key]) for key in _PERIOD_KEYS
+               if time_analysis[key]['has_data']]
+    return {
+        'labels': [f"{p['icon']} {p['label']}" for _, p in periods],
+        'tir':    [p['time_in_range_pct'] for _, p in periods],
+        'hypo':   [p['hypo_pct'] for _, p in periods],
+        'hyper':  [p['hyper_pct'] for _, p in periods],
+        'colors': [_PERIOD_DEFINITIONS[key]['chart_color'] for key, _ in periods],
+    }
+
+
 # ============================================================================
 # US-25: INSIGHT ENGINE (Pattern Detection)
 # ============================================================================
 
-def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict]:
+def generate_insights(entries: Entries, time_analysis: Dict) -> List[Dict]:
     """
     Rule-based pattern detection that surfaces meaningful trends in
     plain, non-medical language.
@@ -428,7 +780,7 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
       'success'  – positive reinforcement
 
     Args:
-        entries: List of LogEntry objects (recommend >= 7 for meaningful output)
+        entries: List of LogEntry objects or a LogBatch (recommend >= 7 for meaningful output)
         time_analysis: Dict returned by analyze_time_of_day()
 
     Returns:
@@ -437,86 +789,91 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
     if len(entries) < 7:
         return []
 
+    batch = LogBatch.from_entries(entries)
     insights = []
 
     # ------------------------------------------------------------------
-    # Rule 1 – Worst time-of-day period
+    # One pass over the columns; the entry-based rules below read these
+    # accumulators. Constants are bound to locals for the loop.
     # ------------------------------------------------------------------
-    periods_with_data = {k: v for k, v in time_analysis.items() if v['has_data'] and v['count'] >= 3}
-
-    if periods_with_data:
-        worst = min(periods_with_data.values(), key=lambda x: x['time_in_range_pct'])
-        best  = max(periods_with_data.values(), key=lambda x: x['time_in_range_pct'])
-
-        if worst['time_in_range_pct'] < 55:
-            insights.append({
-                'type': 'worst_period',
-                'severity': 'warning',
-                'icon': worst['icon'],
-                'title': f"{worst['label']} Readings Need Attention",
-                'message': (
-                    f"Your {worst['label'].lower()} readings ({worst['time_range']}) are in the target "
-                    f"range only {worst['time_in_range_pct']}% of the time. "
-                    f"This is your most challenging part of the day."
-                ),
-                'action': (
-                    f"Try noting what you eat and do during the {worst['label'].lower()} "
-                    f"to help spot what might be causing this."
-                ),
-            })
+    target_max = GLUCOSE_TARGET_MAX
+    low_threshold = GLUCOSE_LOW_THRESHOLD
+    stressed = MOOD_STRESSED
+    glucose_sum = 0.0
+    high_carb_count = 0
+    high_carb_spikes = 0
+    hypo_count = 0
+    stressed_sum = 0.0
+    stressed_count = 0
+    meal_totals = Counter()
+    meal_highs = Counter()
+    unique_days = set()
+    first_day = math.inf
+    last_day = -math.inf
+    for g, c, code, mood, day in zip(batch.glucose, batch.carbs, batch.meal_code,
+                                     batch.mood_code, batch.date_ord):
+        glucose_sum += g
+        high = g > target_max
+        if c is not None and c > 60:
+            high_carb_count += 1
+            high_carb_spikes += high
+        meal_totals[code] += 1
+        meal_highs[code] += high
+        hypo_count += g < low_threshold
+        if mood == stressed:
+            stressed_sum += g
+            stressed_count += 1
+        unique_days.add(day)
+        if day < first_day:
+            first_day = day
+        if day > last_day:
+            last_day = day
+    total = len(batch)
 
-        # ------------------------------------------------------------------
-        # Rule 2 – Best time-of-day period (positive reinforcement)
-        # ------------------------------------------------------------------
-        if best['time_in_range_pct'] >= 70 and best != worst:
-            insights.append({
-                'type': 'best_period',
-                'severity': 'success',
-                'icon': best['icon'],
-                'title': f"Strong {best['label']} Control",
-                'message': (
-                    f"You're in range {best['time_in_range_pct']}% of the time during the "
-                    f"{best['label'].lower()} ({best['time_range']}). "
-                    f"Whatever routine you have then is clearly working!"
-                ),
-                'action': "Keep doing what you're doing during this time.",
-            })
+    # ------------------------------------------------------------------
+    # Rules run tier by tier – warnings, then info, then success – so
+    # the list is already in display order and lower tiers are skipped
+    # once the cap of 5 is reached.
+    # ------------------------------------------------------------------
+    periods_with_data = [v for v in time_analysis.values() if v['has_data'] and v['count'] >= 3]
+    worst = min(periods_with_data, key=lambda x: x['time_in_range_pct'], default=None)
+    best  = max(periods_with_data, key=lambda x: x['time_in_range_pct'], default=None)
 
     # ------------------------------------------------------------------
-    # Rule 3 – High-carb meal correlating with high glucose
+    # Rule 1 – Worst time-of-day period
     # ------------------------------------------------------------------
-    high_carb_entries = [e for e in entries if e.carbs_grams is not None and e.carbs_grams > 60]
-    if len(high_carb_entries) >= 3:
-        spike_after_high_carb = [e for e in high_carb_entries if e.blood_glucose > GLUCOSE_TARGET_MAX]
-        spike_rate = len(spike_after_high_carb) / len(high_carb_entries)
-        if spike_rate > 0.55:
-            insights.append({
-                'type': 'carb_spike',
-                'severity': 'info',
-                'icon': '🥖',
-                'title': 'High-Carb Meals May Cause Spikes',
-                'message': (
-                    f"When you log meals over 60g of carbs, your glucose is above target "
-                    f"{round(spike_rate * 100)}% of the time. "
-                    f"Larger portions seem to push your levels higher."
-                ),
-                'action': (
-                    "Try splitting large carb meals into smaller portions, "
-                    "or swap some carbs for protein or vegetables."
-                ),
-            })
+    if worst is not None and worst['time_in_range_pct'] < 55:
+        insights.append({
+            'type': 'worst_period',
+            'severity': 'warning',
+            'icon': worst['icon'],
+            'title': f"{worst['label']} Readings Need Attention",
+            'message': (
+                f"Your {worst['label'].lower()} readings ({worst['time_range']}) are in the target "
+                f"range only {worst['time_in_range_pct']}% of the time. "
+                f"This is your most challenging part of the day."
+            ),
+            'action': (
+                f"Try noting what you eat and do during the {worst['label'].lower()} "
+                f"to help spot what might be causing this."
+            ),
+        })
 
     # ------------------------------------------------------------------
     # Rule 4 – Consistent post-meal highs for a specific meal type
     # ------------------------------------------------------------------
-    meal_groups: Dict[str, list] = defaultdict(list)
-    for entry in entries:
-        meal_groups[entry.meal_type].append(entry.blood_glucose)
-
-    for meal_type, glucose_vals in meal_groups.items():
-        if meal_type == 'none' or len(glucose_vals) < 5:
-            continue
-        high_pct = len([g for g in glucose_vals if g > GLUCOSE_TARGET_MAX]) / len(glucose_vals)
+    none_code = MEAL_CODES['none']
+
+    # Only flag the worst meal type to avoid noise
+    worst_meal = max(
+        ((code, meal_highs[code] / count) for code, count in meal_totals.items()
+         if code != none_code and count >= 5),
+        key=lambda item: item[1],
+        default=None,
+    )
+    if worst_meal is not None:
+        code, high_pct = worst_meal
+        meal_type = batch.meal_categories[code]
         if high_pct >= 0.65:
             insights.append({
                 'type': 'meal_pattern',
@@ -525,20 +882,17 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
                 'title': f'Consistent Highs After {meal_type.capitalize()}',
                 'message': (
                     f"Your readings logged around {meal_type} are above the target range "
-                    f"{round(high_pct * 100)}% of the time. This is a repeating pattern."
+                    f"{high_pct * 100:.0f}% of the time. This is a repeating pattern."
                 ),
                 'action': (
                     f"Look at what you usually eat at {meal_type} "
                     f"and consider sharing this pattern with your diabetes team."
                 ),
             })
-            break  # Only flag the worst meal type to avoid noise
 
     # ------------------------------------------------------------------
     # Rule 5 – Frequent low glucose events
     # ------------------------------------------------------------------
-    hypo_count = len([e for e in entries if e.blood_glucose < GLUCOSE_LOW_THRESHOLD])
-    total = len(entries)
     hypo_pct = (hypo_count / total) * 100 if total > 0 else 0
 
     if hypo_pct >= 5 or hypo_count >= 5:
@@ -549,7 +903,7 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
             'title': 'Frequent Low Glucose Readings',
             'message': (
                 f"You've had {hypo_count} readings below 3.9 mmol/L "
-                f"({round(hypo_pct, 1)}% of your logs). "
+                f"({hypo_pct:.1f}% of your logs). "
                 f"Frequent lows are worth reviewing with your care team."
             ),
             'action': (
@@ -579,13 +933,34 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
             ),
         })
 
+    # ------------------------------------------------------------------
+    # Rule 3 – High-carb meal correlating with high glucose
+    # ------------------------------------------------------------------
+    if high_carb_count >= 3:
+        spike_rate = high_carb_spikes / high_carb_count
+        if spike_rate > 0.55:
+            insights.append({
+                'type': 'carb_spike',
+                'severity': 'info',
+                'icon': '🥖',
+                'title': 'High-Carb Meals May Cause Spikes',
+                'message': (
+                    f"When you log meals over 60g of carbs, your glucose is above target "
+                    f"{spike_rate * 100:.0f}% of the time. "
+                    f"Larger portions seem to push your levels higher."
+                ),
+                'action': (
+                    "Try splitting large carb meals into smaller portions, "
+                    "or swap some carbs for protein or vegetables."
+                ),
+            })
+
     # ------------------------------------------------------------------
     # Rule 7 – Stress correlating with elevated glucose
     # ------------------------------------------------------------------
-    stressed_entries = [e for e in entries if e.mood == 'stressed']
-    if len(stressed_entries) >= 3:
-        stressed_avg = sum(e.blood_glucose for e in stressed_entries) / len(stressed_entries)
-        overall_avg  = sum(e.blood_glucose for e in entries) / len(entries)
+    if stressed_count >= 3:
+        stressed_avg = stressed_sum / stressed_count
+        overall_avg  = glucose_sum / total
         if stressed_avg > overall_avg + 0.9:
             insights.append({
                 'type': 'stress_correlation',
@@ -594,9 +969,9 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
                 'title': 'Stress and Glucose May Be Linked',
                 'message': (
                     f"On days you log as 'stressed', your average glucose is "
-                    f"{round(stressed_avg, 1)} mmol/L — "
-                    f"{round(stressed_avg - overall_avg, 1)} mmol/L above your overall average "
-                    f"of {round(overall_avg, 1)} mmol/L. "
+                    f"{stressed_avg:.1f} mmol/L — "
+                    f"{stressed_avg - overall_avg:.1f} mmol/L above your overall average "
+                    f"of {overall_avg:.1f} mmol/L. "
                     f"Stress is a well-known glucose trigger."
                 ),
                 'action': (
@@ -605,12 +980,31 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
                 ),
             })
 
+    if len(insights) >= 5:
+        return insights[:5]
+
+    # ------------------------------------------------------------------
+    # Rule 2 – Best time-of-day period (positive reinforcement)
+    # ------------------------------------------------------------------
+    if best is not None and best['time_in_range_pct'] >= 70 and best != worst:
+        insights.append({
+            'type': 'best_period',
+            'severity': 'success',
+            'icon': best['icon'],
+            'title': f"Strong {best['label']} Control",
+            'message': (
+                f"You're in range {best['time_in_range_pct']}% of the time during the "
+                f"{best['label'].lower()} ({best['time_range']}). "
+                f"Whatever routine you have then is clearly working!"
+            ),
+            'action': "Keep doing what you're doing during this time.",
+        })
+
     # ------------------------------------------------------------------
     # Rule 8 – Good logging consistency (positive reinforcement)
     # ------------------------------------------------------------------
-    if len(entries) >= 14:
-        unique_days = set(e.timestamp.date() for e in entries)
-        period_days = max((max(unique_days) - min(unique_days)).days + 1, 1)
+    if total >= 14:
+        period_days = max(last_day - first_day + 1, 1)
         logging_rate = len(unique_days) / period_days
         if logging_rate >= 0.80:
             insights.append({
@@ -620,7 +1014,7 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
                 'title': 'Excellent Logging Consistency',
                 'message': (
                     f"You've logged on {len(unique_days)} out of {period_days} days — "
-                    f"a {round(logging_rate * 100)}% consistency rate. "
+                    f"a {logging_rate * 100:.0f}% consistency rate. "
                     f"Regular logging is one of the most powerful things you can do."
                 ),
                 'action': (
@@ -629,10 +1023,78 @@ def generate_insights(entries: List[LogEntry], time_analysis: Dict) -> List[Dict
                 ),
             })
 
-    # ------------------------------------------------------------------
-    # Sort: warnings first, then info, then success; cap at 5
-    # ------------------------------------------------------------------
-    severity_order = {'warning': 0, 'info': 1, 'success': 2}
-    insights.sort(key=lambda x: severity_order.get(x['severity'], 3))
-
     return insights[:5]
+
+
+# ============================================================================
+# PER-WINDOW RESULT CACHES
+# ============================================================================
+
+# Keyed by the caller with an identity of the entry set that changes whenever
+# the set does (app.window_key), so stale results are simply never hit again.
+# Both memos are FIFO-bounded.
+_WINDOW_CACHE: Dict[tuple, tuple] = {}
+_WINDOW_CACHE_SIZE = 256
+_INSIGHTS_CACHE: Dict[tuple, tuple] = {}
+_INSIGHTS_CACHE_SIZE = 256
+
+
+def _fifo_put(cache: Dict, size: int, key: tuple, value):
+    """Store ``value`` in a bounded memo, evicting the oldest key when full."""
+    if len(cache) >= size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+    return value
+
+
+def cached_window_analytics(key: tuple, load_entries: Callable[[], Entries]) -> tuple:
+    """
+    Memoised (calculate_advanced_metrics(), identify_recurring_patterns(),
+    generate_weekly_suggestion()) for one non-empty entry set.
+
+    Args:
+        key: Hashable identity of the entry set, e.g.
+             (user_id, days, latest_entry_id, entry_count, latest_timestamp)
+        load_entries: Returns the entries (LogEntry objects, rows or a
+                      LogBatch); only called on a cache miss
+
+    Returns:
+        (metrics, patterns, suggestion). metrics is a fresh dict per call;
+        patterns is shared between requests: treat it as read-only.
+    """
+    cached = _WINDOW_CACHE.get(key)
+    if cached is None:
+        batch = LogBatch.from_entries(load_entries())
+        counts = precompute_pattern_counts(batch)
+        cached = _fifo_put(_WINDOW_CACHE, _WINDOW_CACHE_SIZE, key, (
+            _raw_metrics(batch),
+            identify_recurring_patterns(batch, counts),
+            generate_weekly_suggestion(batch, counts),
+        ))
+    raw, patterns, suggestion = cached
+    return format_metrics(raw), patterns, suggestion
+
+
+def cached_time_of_day_insights(key: tuple, load_entries: Callable[[], Entries]) -> tuple:
+    """
+    Memoised (analyze_time_of_day(), time_of_day_chart(), generate_insights())
+    for one entry set.
+
+    Args:
+        key: Hashable identity of the entry set, as for cached_window_analytics()
+        load_entries: Returns the entries; only called on a cache miss
+
+    Returns:
+        (time_analysis, tod_chart, insights). Shared between requests: treat
+        as read-only.
+    """
+    result = _INSIGHTS_CACHE.get(key)
+    if result is None:
+        entries = LogBatch.from_entries(load_entries())
+        time_analysis = analyze_time_of_day(entries)
+        result = _fifo_put(_INSIGHTS_CACHE, _INSIGHTS_CACHE_SIZE, key, (
+            time_analysis,
+            time_of_day_chart(time_analysis),
+            generate_insights(entries, time_analysis),
+        ))
+    return result
@@ -1,9 +1,14 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, \
-    send_from_directory, send_file, make_response, session
+    send_from_directory, send_file, make_response, session, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from datetime import datetime, timedelta
+from functools import cache, partial
+from itertools import chain
+from typing import Optional
+import gzip
 import os
 import random
+import zlib
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -14,19 +19,25 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pancrepal.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Import db after app is created
-from db import db, User, LogEntry, UserProgress
+from db import db, User, LogEntry, UserProgress, utcnow
 from gamification import update_streak, check_and_award_badges, get_daily_tip, should_show_reminder
-from analytics import (calculate_advanced_metrics, identify_recurring_patterns,
-                       generate_weekly_suggestion, get_metric_explanation,
-                       analyze_time_of_day, generate_insights)
-from exports import generate_csv_export
+from analytics import (METRIC_EXPLANATIONS, cached_window_analytics,
+                       cached_time_of_day_insights)
+from exports import iter_csv_export
 
 # Initialize database with app
 db.init_app(app)
 
-# Create tables if they don't exist
+# Create tables if they don't exist. One table listing on a warm boot instead
+# of create_all()'s per-table checks; new columns go through the add_* scripts
 with app.app_context():
-    db.create_all()
+    if set(db.metadata.tables) - set(db.inspect(db.engine).get_table_names()):
+        db.create_all()
+
+# Compile every template at startup, so a fresh worker's first requests
+# don't pay for it (Jinja's cache holds 400 templates; there are far fewer)
+for template_name in app.jinja_env.list_templates(extensions=['html']):
+    app.jinja_env.get_template(template_name)
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -41,7 +52,24 @@ login_manager.login_message = 'Please log in to access this page.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Flask-Login memoises the result on g for the request, and session.get
+    # checks the identity map before querying. User.progress is joined-loaded,
+    # so a miss is one query.
+    return db.session.get(User, int(user_id))
+
+
+def current_progress() -> UserProgress:
+    """
+    The logged-in user's UserProgress, created if the account has none.
+
+    Reads the joined-loaded current_user.progress, so no query is issued
+    unless the row has to be created.
+    """
+    progress = current_user.progress
+    if progress is None:
+        progress = current_user.progress = UserProgress(user_id=current_user.id)
+        db.session.commit()
+    return progress
 
 
 # ============================================================================
@@ -57,30 +85,31 @@ def is_demo_mode() -> bool:
     return session.get('demo_mode', False)
 
 
-@app.context_processor
-def inject_demo_mode():
-    """Make is_demo available in every template automatically."""
-    return {'is_demo': is_demo_mode()}
+# Available in every template as is_demo(); a global costs nothing per render
+app.jinja_env.globals['is_demo'] = is_demo_mode
 
 
-def ensure_demo_user():
+def ensure_demo_user() -> User:
     """
     Create the demo user account and seed it with 45 days of realistic
-    read-only data if it does not already exist.
+    read-only data if it does not already exist, and return it.
 
-    Called once when /demo is first visited. Subsequent visits reuse the
-    persisted data (no reset required per US-26).
+    Called on every /demo visit. Subsequent visits reuse the persisted data
+    (no reset required per US-26), so the warm path is a single query that
+    fetches the user (progress joined) together with its entry count.
     """
-    user = User.query.filter_by(email=DEMO_USER_EMAIL).first()
+    entry_count = db.select(db.func.count(LogEntry.id)).where(
+        LogEntry.user_id == User.id
+    ).scalar_subquery()
+    row = db.session.execute(
+        db.select(User, entry_count).where(User.email == DEMO_USER_EMAIL)
+    ).first()
+    user, entry_count = row if row else (None, 0)
 
     if not user:
         user = User(email=DEMO_USER_EMAIL)
         user.set_password(DEMO_USER_PASSWORD)
-        db.session.add(user)
-        db.session.commit()
-
-        progress = UserProgress(
-            user_id=user.id,
+        user.progress = UserProgress(
             current_streak=12,
             longest_streak=21,
             total_logs=0,
@@ -88,14 +117,15 @@ def ensure_demo_user():
             selected_avatar='default',
             unlocked_avatars='default,space',
         )
-        db.session.add(progress)
+        db.session.add(user)
         db.session.commit()
 
     # Only seed if nearly empty
-    entry_count = LogEntry.query.filter_by(user_id=user.id).count()
     if entry_count < 10:
         _seed_demo_data(user.id)
 
+    return user
+
 
 def _seed_demo_data(user_id: int):
     """
@@ -167,20 +197,20 @@ def _seed_demo_data(user_id: int):
             if rng.random() < 0.72:
                 carbs = rng.randint(carb_min, carb_max)
 
-            entries.append(LogEntry(
-                user_id=user_id,
-                timestamp=timestamp,
-                blood_glucose=glucose,
-                meal_type=meal_type,
-                mood=mood,
-                notes=None,
-                carbs_grams=carbs,
-            ))
+            entries.append({
+                'user_id': user_id,
+                'timestamp': timestamp,
+                'blood_glucose': glucose,
+                'meal_type': meal_type,
+                'mood': mood,
+                'notes': None,
+                'carbs_grams': carbs,
+            })
 
         current += timedelta(days=1)
 
-    # Batch insert for speed
-    db.session.bulk_save_objects(entries)
+    # One Core executemany INSERT: plain dicts, no ORM objects to build or flush
+    db.session.execute(LogEntry.__table__.insert(), entries)
 
     progress = UserProgress.query.filter_by(user_id=user_id).first()
     if progress:
@@ -202,10 +232,9 @@ def demo():
     Creates (or reuses) the demo account, logs the session in as that user,
     and sets the demo_mode flag so all write routes are blocked.
     """
-    # ensure_demo_user() handles creation/seeding. We then re-query the user
-    # so it is bound to the current request's DB session (avoids DetachedInstanceError).
-    ensure_demo_user()
-    demo_user = User.query.filter_by(email=DEMO_USER_EMAIL).first()
+    # ensure_demo_user() handles creation/seeding and returns the user bound
+    # to the current request's DB session.
+    demo_user = ensure_demo_user()
 
     if not demo_user:
         flash('Demo mode could not be initialised. Please try again.', 'error')
@@ -218,6 +247,29 @@ def demo():
     return redirect(url_for('index'))
 
 
+# ============================================================================
+# PUBLIC PAGE RENDERING
+# ============================================================================
+
+# Rendered HTML of the public pages as an anonymous visitor sees them
+_PUBLIC_PAGE_CACHE = {}
+
+
+def render_public_page(template: str) -> str:
+    """
+    Render a public page, reusing the anonymous render when possible.
+
+    These pages only vary by login state, demo mode and pending flash
+    messages, so a visitor with none of those gets the cached HTML.
+    """
+    if current_user.is_authenticated or is_demo_mode() or '_flashes' in session:
+        return render_template(template)
+    html = _PUBLIC_PAGE_CACHE.get(template)
+    if html is None:
+        html = _PUBLIC_PAGE_CACHE[template] = render_template(template)
+    return html
+
+
 # ============================================================================
 # AUTHENTICATION ROUTES
 # ============================================================================
@@ -258,17 +310,16 @@ def register():
         user = User(email=email)
         user.set_password(password)
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()  # assigns user.id without ending the transaction
 
-        progress = UserProgress(user_id=user.id)
-        db.session.add(progress)
+        db.session.add(UserProgress(user_id=user.id))
         db.session.commit()
 
         login_user(user)
         flash('Account created successfully! Welcome to PancrePal.', 'success')
         return redirect(url_for('index'))
 
-    return render_template('register.html')
+    return render_public_page('register.html')
 
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -290,7 +341,7 @@ def login():
 
         if user and user.check_password(password):
             login_user(user, remember=remember)
-            user.last_login = datetime.utcnow()
+            user.last_login = utcnow()
             db.session.commit()
             flash('Welcome back!', 'success')
 
@@ -301,7 +352,7 @@ def login():
         else:
             flash('Invalid email or password.', 'error')
 
-    return render_template('login.html')
+    return render_public_page('login.html')
 
 
 @app.route('/logout')
@@ -318,6 +369,42 @@ def logout():
 # MAIN APPLICATION ROUTES
 # ============================================================================
 
+# Columns the analytics helpers read. Querying just these returns light,
+# attribute-accessible rows instead of instrumented ORM objects.
+ANALYTICS_COLUMNS = (
+    LogEntry.timestamp, LogEntry.blood_glucose,
+    LogEntry.carbs_grams, LogEntry.meal_type, LogEntry.mood,
+)
+
+def fetch_analytics_rows(user_id: int, cutoff: datetime) -> list:
+    """A user's ANALYTICS_COLUMNS rows since ``cutoff``, newest first."""
+    return LogEntry.query.with_entities(*ANALYTICS_COLUMNS).filter(
+        LogEntry.user_id == user_id,
+        LogEntry.timestamp >= cutoff
+    ).order_by(LogEntry.timestamp.desc()).all()
+
+
+def window_key(user_id: int, days: int, cutoff: datetime) -> Optional[tuple]:
+    """
+    Cache key for analytics over a user's last ``days`` of entries, or None
+    if the window is empty: (user_id, days, newest id, entry count, newest
+    timestamp), from one aggregate query without loading any rows.
+
+    The app only ever adds entries, so the newest id and the count change
+    whenever an entry is logged or ages out of the window. seed.py drops and
+    recreates the tables, though, restarting ids from 1 under a running app.
+    The newest timestamp keeps a reseeded window from matching a key cached
+    for the old data.
+    """
+    latest_id, entry_count, latest_ts = db.session.query(
+        db.func.max(LogEntry.id), db.func.count(LogEntry.id), db.func.max(LogEntry.timestamp)
+    ).filter(
+        LogEntry.user_id == user_id,
+        LogEntry.timestamp >= cutoff
+    ).one()
+    return (user_id, days, latest_id, entry_count, latest_ts) if entry_count else None
+
+
 @app.route('/')
 @login_required
 def index():
@@ -327,49 +414,56 @@ def index():
     """
     user_id = current_user.id
 
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    entries = LogEntry.query.filter(
-        LogEntry.user_id == user_id,
-        LogEntry.timestamp >= thirty_days_ago
-    ).order_by(LogEntry.timestamp.desc()).all()
+    now_utc = utcnow()
+    thirty_days_ago = now_utc - timedelta(days=30)
+    seven_days_ago = now_utc - timedelta(days=7)
+    in_window = (LogEntry.user_id == user_id, LogEntry.timestamp >= thirty_days_ago)
 
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
-    if not progress:
-        progress = UserProgress(user_id=user_id)
-        db.session.add(progress)
-        db.session.commit()
+    # Only the 30 most recent entries are displayed (chart and recent logs)
+    entries = LogEntry.query.filter(*in_window).order_by(
+        LogEntry.timestamp.desc()).limit(30).all()
+
+    # One aggregate query for the window: the analytics cache key (as in
+    # window_key) plus the number of distinct days logged in the last week
+    latest_id, entry_count, latest_ts, days_logged = db.session.query(
+        db.func.max(LogEntry.id),
+        db.func.count(LogEntry.id),
+        db.func.max(LogEntry.timestamp),
+        db.func.count(db.distinct(db.case(
+            (LogEntry.timestamp >= seven_days_ago, db.func.date(LogEntry.timestamp))
+        ))),
+    ).filter(*in_window).one()
+
+    progress = current_progress()
 
     if entries and not is_demo_mode():
         today = datetime.now().date()
         latest_entry_date = entries[0].timestamp.date()
         if latest_entry_date == today:
             update_streak(user_id, today)
+            db.session.commit()
 
-    # Weekly consistency
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_entries = LogEntry.query.filter(
-        LogEntry.user_id == user_id,
-        LogEntry.timestamp >= seven_days_ago
-    ).all()
-
-    unique_days = set(e.timestamp.date() for e in recent_entries)
-    weekly_consistency = round((len(unique_days) / 7) * 100, 1)
+    weekly_consistency = round((days_logged / 7) * 100, 1)
 
     daily_tip = get_daily_tip()
     reminder = should_show_reminder(user_id) if not is_demo_mode() else None
 
-    advanced_metrics = calculate_advanced_metrics(entries) if entries else None
-    patterns = identify_recurring_patterns(entries) if entries else []
-    suggestion = generate_weekly_suggestion(entries) if entries else None
-
-    # Chart data
-    chart_data = {'labels': [], 'glucose': [], 'carbs': [], 'mood': []}
-    for entry in reversed(entries[:30]):
-        chart_data['labels'].append(entry.timestamp.strftime('%d/%m'))
-        chart_data['glucose'].append(entry.blood_glucose)
-        chart_data['carbs'].append(entry.carbs_grams if entry.carbs_grams is not None else 0)
-        mood_map = {'happy': 5, 'calm': 4, 'stressed': 3, 'tired': 2, 'frustrated': 1}
-        chart_data['mood'].append(mood_map.get(entry.mood, 3))
+    if entry_count:
+        # The full window's rows are only fetched when the cache misses
+        advanced_metrics, patterns, suggestion = cached_window_analytics(
+            (user_id, 30, latest_id, entry_count, latest_ts),
+            lambda: fetch_analytics_rows(user_id, thirty_days_ago))
+    else:
+        advanced_metrics, patterns, suggestion = None, [], None
+
+    # Chart data: the 30 most recent entries, oldest first. Only the series
+    # the dashboard chart plots are built and serialised into the page.
+    recent = entries[::-1]
+    chart_data = {
+        'labels':  [e.timestamp.strftime('%d/%m') for e in recent],
+        'glucose': [e.blood_glucose for e in recent],
+        'carbs':   [e.carbs_grams if e.carbs_grams is not None else 0 for e in recent],
+    }
 
     return render_template(
         'index.html',
@@ -439,16 +533,14 @@ def log_entry():
             carbs_grams=carbs_value,
         )
         db.session.add(entry)
-        db.session.commit()
 
+        # Entry, streak and badges are saved in one transaction
         today = datetime.now().date()
-        update_streak(user_id, today)
-
-        progress = UserProgress.query.filter_by(user_id=user_id).first()
-        if progress:
-            newly_earned = check_and_award_badges(progress)
-            for badge in newly_earned:
-                flash(f'🏆 Badge earned: {badge["name"]}!', 'success')
+        progress = update_streak(user_id, today)
+        newly_earned = check_and_award_badges(progress) if progress else []
+        db.session.commit()
+        for badge in newly_earned:
+            flash(f'🏆 Badge earned: {badge["name"]}!', 'success')
 
         flash('Entry logged successfully!', 'success')
         return redirect(url_for('index'))
@@ -460,6 +552,13 @@ def log_entry():
 # US-21: EXPORT ROUTES (CSV only)
 # ============================================================================
 
+# Columns written by the CSV export
+EXPORT_COLUMNS = (
+    LogEntry.timestamp, LogEntry.blood_glucose, LogEntry.carbs_grams,
+    LogEntry.meal_type, LogEntry.mood, LogEntry.notes,
+)
+
+
 @app.route('/export/csv')
 @login_required
 def export_csv():
@@ -471,19 +570,21 @@ def export_csv():
     user_id = current_user.id
     days = request.args.get('days', 30, type=int)
 
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    entries = LogEntry.query.filter(
+    cutoff_date = utcnow() - timedelta(days=days)
+    # Oldest first, the CSV row order; only the exported columns, read in
+    # batches as the response streams
+    rows = iter(LogEntry.query.filter(
         LogEntry.user_id == user_id,
         LogEntry.timestamp >= cutoff_date
-    ).order_by(LogEntry.timestamp.desc()).all()
+    ).order_by(LogEntry.timestamp.asc()).with_entities(*EXPORT_COLUMNS).yield_per(500))
 
-    if not entries:
+    first = next(rows, None)
+    if first is None:
         flash('No data available for export.', 'error')
         return redirect(url_for('index'))
 
-    csv_data = generate_csv_export(entries)
-    response = make_response(csv_data)
-    response.headers['Content-Type'] = 'text/csv'
+    response = Response(stream_with_context(iter_csv_export(chain((first,), rows))),
+                        mimetype='text/csv')
     response.headers['Content-Disposition'] = (
         f'attachment; filename=pancrepal_data_{days}days_{datetime.now().strftime("%Y%m%d")}.csv'
     )
@@ -506,65 +607,31 @@ def analytics():
     user_id = current_user.id
     days = request.args.get('days', 30, type=int)
 
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    entries = LogEntry.query.filter(
-        LogEntry.user_id == user_id,
-        LogEntry.timestamp >= cutoff_date
-    ).order_by(LogEntry.timestamp.desc()).all()
+    cutoff_date = utcnow() - timedelta(days=days)
+    # Results are reused until a new entry is logged (see window_key)
+    key = window_key(user_id, days, cutoff_date)
 
-    if not entries:
+    if key is None:
         flash('No data available for analysis. Start logging to see insights!', 'info')
         return redirect(url_for('index'))
 
-    # US-23: Core metrics
-    metrics = calculate_advanced_metrics(entries)
-    patterns = identify_recurring_patterns(entries)
-    suggestion = generate_weekly_suggestion(entries)
-
-    explanations = {
-        'time_in_range':          get_metric_explanation('time_in_range'),
-        'coefficient_of_variation': get_metric_explanation('coefficient_of_variation'),
-        'hypo_events':            get_metric_explanation('hypo_events'),
-        'hyper_events':           get_metric_explanation('hyper_events'),
-        'avg_glucose':            get_metric_explanation('avg_glucose'),
-        'avg_daily_carbs':        get_metric_explanation('avg_daily_carbs'),
-    }
+    # Only analysed, never displayed: light rows, fetched at most once and
+    # only if one of the caches misses
+    load_rows = cache(partial(fetch_analytics_rows, user_id, cutoff_date))
 
-    # US-27: Time-of-day breakdown
-    time_analysis = analyze_time_of_day(entries)
+    # US-23: Core metrics
+    metrics, patterns, suggestion = cached_window_analytics(key, load_rows)
 
-    # Build chart data for time-of-day TIR bar chart (passed as JSON to template)
-    tod_chart = {
-        'labels': [],
-        'tir':    [],
-        'hypo':   [],
-        'hyper':  [],
-        'colors': [],
-    }
-    color_map = {
-        'morning':   'rgba(255, 186, 73, 0.8)',
-        'afternoon': 'rgba(74, 144, 226, 0.8)',
-        'evening':   'rgba(155, 89, 182, 0.8)',
-        'night':     'rgba(52, 73, 94, 0.8)',
-    }
-    for period_key in ['morning', 'afternoon', 'evening', 'night']:
-        p = time_analysis[period_key]
-        if p['has_data']:
-            tod_chart['labels'].append(f"{p['icon']} {p['label']}")
-            tod_chart['tir'].append(p['time_in_range_pct'])
-            tod_chart['hypo'].append(p['hypo_pct'])
-            tod_chart['hyper'].append(p['hyper_pct'])
-            tod_chart['colors'].append(color_map[period_key])
-
-    # US-25: Insight Engine
-    insights = generate_insights(entries, time_analysis)
+    # US-27: Time-of-day breakdown (with its TIR bar chart series, passed as
+    # JSON to the template) and US-25: Insight Engine
+    time_analysis, tod_chart, insights = cached_time_of_day_insights(key, load_rows)
 
     return render_template(
         'analytics.html',
         metrics=metrics,
         patterns=patterns,
         suggestion=suggestion,
-        explanations=explanations,
+        explanations=METRIC_EXPLANATIONS,
         days=days,
         time_analysis=time_analysis,
         tod_chart=tod_chart,
@@ -580,12 +647,7 @@ def analytics():
 @login_required
 def avatar():
     """Avatar customization page."""
-    user_id = current_user.id
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
-    if not progress:
-        progress = UserProgress(user_id=user_id)
-        db.session.add(progress)
-        db.session.commit()
+    progress = current_progress()
 
     available_avatars = ['default']
     unlocked = progress.get_unlocked_avatars()
@@ -602,10 +664,9 @@ def update_avatar():
         flash('Avatar changes are disabled in demo mode.', 'info')
         return redirect(url_for('avatar'))
 
-    user_id = current_user.id
     avatar_id = request.form.get('avatar_id')
     if avatar_id:
-        progress = UserProgress.query.filter_by(user_id=user_id).first()
+        progress = current_user.progress
         if progress:
             progress.selected_avatar = avatar_id
             db.session.commit()
@@ -624,47 +685,91 @@ def settings():
         flash('Settings updated successfully!', 'success')
         return redirect(url_for('settings'))
 
-    user_id = current_user.id
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
-    if not progress:
-        progress = UserProgress(user_id=user_id)
-        db.session.add(progress)
-        db.session.commit()
-
+    progress = current_progress()
     return render_template('settings.html', progress=progress.to_dict())
 
 
 @app.route('/ethics')
 def ethics():
     """Data Ethics & Privacy page — accessible without login."""
-    return render_template('ethics.html')
+    return render_public_page('ethics.html')
 
 
 # ============================================================================
 # API ROUTES
 # ============================================================================
 
+def not_modified(etag: str):
+    """A 304 response if the client already holds ``etag``, else None."""
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(make_response('', 304), etag)
+    return None
+
+
+def with_etag(response, etag: str):
+    """
+    Tag a per-user JSON response. Clients must revalidate before reuse, which
+    costs one watermark query and a 304 when nothing has changed.
+    """
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def window_etag(kind: str, key: tuple) -> str:
+    """ETag for a ``kind`` payload built from the entry window ``key`` (see window_key)."""
+    user_id, days, latest_id, entry_count, latest_ts = key
+    return f'{kind}-{user_id}-{days}-{latest_id}-{entry_count}-{latest_ts:%Y%m%d%H%M%S%f}'
+
+
+# Columns served by /api/entries (user_id is the caller's own)
+API_ENTRY_COLUMNS = (
+    LogEntry.id, LogEntry.timestamp, LogEntry.blood_glucose, LogEntry.meal_type,
+    LogEntry.mood, LogEntry.notes, LogEntry.carbs_grams,
+)
+
+
 @app.route('/api/entries', methods=['GET'])
 @login_required
 def api_entries():
     user_id = current_user.id
     days = request.args.get('days', 30, type=int)
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    entries = LogEntry.query.filter(
+    cutoff_date = utcnow() - timedelta(days=days)
+    # The window key is the watermark of the payload
+    key = window_key(user_id, days, cutoff_date)
+    etag = window_etag('entries', key) if key else f'entries-{user_id}-{days}-empty'
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    # Light rows rather than ORM objects; same payload as LogEntry.to_dict()
+    rows = LogEntry.query.filter(
         LogEntry.user_id == user_id,
         LogEntry.timestamp >= cutoff_date
-    ).order_by(LogEntry.timestamp.desc()).all()
-    return jsonify([e.to_dict() for e in entries])
+    ).order_by(LogEntry.timestamp.desc()).with_entities(*API_ENTRY_COLUMNS).all()
+    return with_etag(jsonify([{
+        'id': r.id,
+        'user_id': user_id,
+        'timestamp': r.timestamp.isoformat(),
+        'blood_glucose': r.blood_glucose,
+        'meal_type': r.meal_type,
+        'mood': r.mood,
+        'notes': r.notes,
+        'carbs_grams': r.carbs_grams,
+    } for r in rows]), etag)
 
 
 @app.route('/api/progress', methods=['GET'])
 @login_required
 def api_progress():
-    user_id = current_user.id
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
+    progress = current_user.progress
     if not progress:
         return jsonify({'error': 'No progress found'}), 404
-    return jsonify(progress.to_dict())
+    etag = f'progress-{progress.id}-{progress.updated_at.isoformat()}'
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(jsonify(progress.to_dict()), etag)
 
 
 @app.route('/api/metrics', methods=['GET'])
@@ -672,38 +777,93 @@ def api_progress():
 def api_metrics():
     user_id = current_user.id
     days = request.args.get('days', 30, type=int)
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    entries = LogEntry.query.filter(
-        LogEntry.user_id == user_id,
-        LogEntry.timestamp >= cutoff_date
-    ).all()
-    if not entries:
+    cutoff_date = utcnow() - timedelta(days=days)
+    key = window_key(user_id, days, cutoff_date)
+    if key is None:
         return jsonify({'error': 'No data available'}), 404
-    return jsonify(calculate_advanced_metrics(entries))
+    etag = window_etag('metrics', key)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    metrics, _, _ = cached_window_analytics(
+        key, partial(fetch_analytics_rows, user_id, cutoff_date))
+    return with_etag(jsonify(metrics), etag)
 
 
 # ============================================================================
 # PWA ROUTES
 # ============================================================================
 
+# Browser cache lifetimes (seconds). send_from_directory also sends ETag and
+# Last-Modified, so expired copies revalidate with a cheap 304. The service
+# worker is always revalidated so app updates are picked up immediately.
+MANIFEST_MAX_AGE = 86400        # 1 day
+ICON_MAX_AGE = 7 * 86400        # 1 week
+SERVICE_WORKER_MAX_AGE = 0
+
+
 @app.route('/manifest.json')
 def manifest():
-    return send_from_directory('static', 'manifest.json')
+    return send_from_directory('static', 'manifest.json', max_age=MANIFEST_MAX_AGE)
 
 
 @app.route('/service-worker.js')
 def service_worker():
-    return send_from_directory('static', 'service-worker.js')
+    return send_from_directory('static', 'service-worker.js', max_age=SERVICE_WORKER_MAX_AGE)
 
 
 @app.route('/apple-touch-icon.png')
 def apple_touch_icon():
-    return send_from_directory('static/icons', 'icon-192x192.png')
+    return send_from_directory('static/icons', 'icon-192x192.png', max_age=ICON_MAX_AGE)
 
 
 @app.route('/favicon.ico')
 def favicon():
-    return send_from_directory('static/icons', 'icon-192x192.png')
+    return send_from_directory('static/icons', 'icon-192x192.png', max_age=ICON_MAX_AGE)
+
+
+# ============================================================================
+# RESPONSE COMPRESSION
+# ============================================================================
+
+# Text responses worth gzipping; static files set their own caching and are
+# passed through untouched
+COMPRESS_MIMETYPES = {'application/json', 'text/csv', 'text/html'}
+COMPRESS_MIN_SIZE = 500
+COMPRESS_LEVEL = 5
+
+
+def gzip_stream(chunks):
+    """Gzip a streamed body chunk by chunk, keeping it streamed."""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.after_request
+def compress_response(response):
+    """Gzip JSON, CSV and HTML bodies for clients that accept it."""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or not request.accept_encodings['gzip']):
+        return response
+
+    if response.is_streamed:
+        response.response = gzip_stream(response.iter_encoded())
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(body, COMPRESS_LEVEL))
+
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
 
 
 # ============================================================================
@@ -712,12 +872,16 @@ def favicon():
 
 @app.errorhandler(404)
 def page_not_found(e):
-    return render_template('404.html'), 404
+    return render_public_page('404.html'), 404
 
 
 @app.errorhandler(500)
 def internal_server_error(e):
-    return render_template('500.html'), 500
+    try:
+        return render_public_page('500.html'), 500
+    except Exception:
+        # The error page must not fail in turn, e.g. when the database is down
+        return 'Internal Server Error', 500
 
 
 # ============================================================================
@@ -726,6 +890,3 @@ def internal_server_error(e):
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5002)
-else:
-    with app.app_context():
-        db.create_all()
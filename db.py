@@ -1,12 +1,40 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from datetime import datetime, timezone
+import sqlite3
 import bcrypt
 
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
 
 
+@event.listens_for(Engine, 'connect')
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection: WAL lets dashboard and analytics reads
+    run while an entry is being written, and NORMAL sync is safe under WAL.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+
+def utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime, the form timestamps are stored in.
+
+    Replaces datetime.utcnow(), which is deprecated from Python 3.12.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(UserMixin, db.Model):
     """
     User account model for authentication.
@@ -36,7 +64,7 @@ class User(UserMixin, db.Model):
     # Timestamps
     created_at = db.Column(
         db.DateTime,
-        default=datetime.utcnow
+        default=utcnow
     )
 
     last_login = db.Column(
@@ -52,10 +80,12 @@ class User(UserMixin, db.Model):
         cascade='all, delete-orphan'
     )
 
+    # Joined-loaded so current_user.progress comes with the login query
     progress = db.relationship(
         'UserProgress',
         backref='user',
         uselist=False,
+        lazy='joined',
         cascade='all, delete-orphan'
     )
 
@@ -104,6 +134,11 @@ class LogEntry(db.Model):
     """
 
     __tablename__ = 'log_entries'
+    __table_args__ = (
+        # Serves the per-user date-range queries (filter by user, range and
+        # order by timestamp) with one index range scan and no sort step
+        db.Index('ix_log_entries_user_timestamp', 'user_id', 'timestamp'),
+    )
 
     # Primary key
     id = db.Column(db.Integer, primary_key=True)
@@ -120,7 +155,7 @@ class LogEntry(db.Model):
     timestamp = db.Column(
         db.DateTime,
         nullable=False,
-        default=datetime.utcnow,
+        default=utcnow,
         index=True  # Indexed for efficient date-range queries
     )
 
@@ -268,13 +303,13 @@ class UserProgress(db.Model):
     # Timestamps
     created_at = db.Column(
         db.DateTime,
-        default=datetime.utcnow
+        default=utcnow
     )
 
     updated_at = db.Column(
         db.DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow
+        default=utcnow,
+        onupdate=utcnow
     )
 
     def __repr__(self):
@@ -13,55 +13,60 @@ FEATURES:
 
 import csv
 import io
-from datetime import datetime
-from typing import List
-
-from db import LogEntry
+from typing import Iterable, Iterator
 
 
 # ============================================================================
 # CSV EXPORT
 # ============================================================================
 
-def generate_csv_export(entries: List[LogEntry]) -> str:
-    """
-    Generate CSV file with all log entry data.
+CSV_HEADER = [
+    'Date',
+    'Time',
+    'Blood Glucose (mmol/L)',
+    'Carbs (g)',
+    'Meal Type',
+    'Mood',
+    'Notes'
+]
+
+# Rows written to the buffer before each chunk is yielded
+_CHUNK_ROWS = 500
 
-    Format optimized for:
-    - Import into Excel/Google Sheets
-    - Clinical review systems
-    - Personal backup
+
+def iter_csv_export(entries: Iterable) -> Iterator[str]:
+    """
+    Yield the CSV export in chunks, for streaming responses.
 
     Args:
-        entries: List of LogEntry objects
+        entries: LogEntry objects or rows with the same attributes,
+                 already sorted oldest first
 
-    Returns:
-        CSV string ready for download
+    Yields:
+        CSV text, header first, then up to _CHUNK_ROWS rows per chunk
     """
     output = io.StringIO()
     writer = csv.writer(output)
-
-    # Header row
-    writer.writerow([
-        'Date',
-        'Time',
-        'Blood Glucose (mmol/L)',
-        'Carbs (g)',
-        'Meal Type',
-        'Mood',
-        'Notes'
-    ])
+    writer.writerow(CSV_HEADER)
 
     # Data rows - Irish date format (DD/MM/YYYY)
-    for entry in sorted(entries, key=lambda e: e.timestamp):
+    pending = 0
+    for entry in entries:
+        ts = entry.timestamp
         writer.writerow([
-            entry.timestamp.strftime('%d/%m/%Y'),  # DD/MM/YYYY for Ireland
-            entry.timestamp.strftime('%H:%M'),
+            f'{ts.day:02d}/{ts.month:02d}/{ts.year}',  # DD/MM/YYYY for Ireland
+            f'{ts.hour:02d}:{ts.minute:02d}',
             entry.blood_glucose,
             entry.carbs_grams if entry.carbs_grams is not None else '',
             entry.meal_type,
             entry.mood,
             entry.notes if entry.notes else ''
         ])
+        pending += 1
+        if pending == _CHUNK_ROWS:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+            pending = 0
 
-    return output.getvalue()
+    yield output.getvalue()
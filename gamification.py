@@ -4,22 +4,38 @@ Handles streaks, badges, and daily tips.
 """
 
 from datetime import datetime, date, timedelta
-from db import db, UserProgress, BADGES
+from functools import lru_cache
+from db import db, User, UserProgress, BADGES
 import random
 
 
+def _get_progress(user_id: int):
+    """
+    The user's UserProgress, or None.
+
+    Goes through the User, whose progress is joined-loaded: inside a request
+    the logged-in user is already in the session, so this costs no query.
+    """
+    user = db.session.get(User, user_id)
+    return user.progress if user else None
+
+
 def update_streak(user_id: int, log_date: date):
     """
-    Update user's streak based on new log entry.
+    Update user's streak based on new log entry. Changes are left in the
+    session for the caller to commit.
 
     Args:
         user_id: User ID
         log_date: Date of the log entry (as date object)
+
+    Returns:
+        The updated UserProgress, or None if the user has none
     """
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
+    progress = _get_progress(user_id)
 
     if not progress:
-        return
+        return None
 
     # Increment total logs
     progress.total_logs += 1
@@ -47,12 +63,24 @@ def update_streak(user_id: int, log_date: date):
     # Update last log date
     progress.last_log_date = log_date
 
-    db.session.commit()
+    return progress
+
+
+# (badge id, UserProgress counter, threshold), checked in award order
+_BADGE_THRESHOLDS = (
+    ('first_log', 'total_logs', 1),
+    ('streak_3', 'current_streak', 3),
+    ('streak_7', 'current_streak', 7),
+    ('streak_30', 'current_streak', 30),
+    ('logs_50', 'total_logs', 50),
+    ('logs_100', 'total_logs', 100),
+)
 
 
 def check_and_award_badges(progress: UserProgress) -> list:
     """
-    Check if user has earned any new badges.
+    Check if user has earned any new badges. Changes are left in the
+    session for the caller to commit.
 
     Args:
         progress: UserProgress object
@@ -60,80 +88,81 @@ def check_and_award_badges(progress: UserProgress) -> list:
     Returns:
         List of newly earned badge dictionaries
     """
-    newly_earned = []
-
-    # Check each badge condition
-    badge_conditions = [
-        ('first_log', progress.total_logs >= 1),
-        ('streak_3', progress.current_streak >= 3),
-        ('streak_7', progress.current_streak >= 7),
-        ('streak_30', progress.current_streak >= 30),
-        ('logs_50', progress.total_logs >= 50),
-        ('logs_100', progress.total_logs >= 100),
+    # Parse the stored badge list once instead of per has_badge() call
+    owned = set((progress.badges_earned or '').split(','))
+    new_ids = [
+        badge_id for badge_id, attr, threshold in _BADGE_THRESHOLDS
+        if badge_id not in owned and getattr(progress, attr) >= threshold
     ]
 
-    for badge_id, condition in badge_conditions:
-        if condition and not progress.has_badge(badge_id):
-            progress.add_badge(badge_id)
-            newly_earned.append(BADGES[badge_id])
-
-    if newly_earned:
-        db.session.commit()
-
-    return newly_earned
+    if new_ids:
+        progress.badges_earned = ','.join(
+            filter(None, [progress.badges_earned, *new_ids]))
+
+    return [BADGES[badge_id] for badge_id in new_ids]
+
+
+DAILY_TIPS = (
+    {
+        'tip': 'Try logging at the same times each day to spot patterns more easily.',
+        'category': 'consistency'
+    },
+    {
+        'tip': 'Tracking your mood helps identify emotional triggers for high or low glucose.',
+        'category': 'mood'
+    },
+    {
+        'tip': 'Logging carbs alongside glucose can reveal how different foods affect you.',
+        'category': 'carbs'
+    },
+    {
+        'tip': 'Small consistent habits matter more than perfect readings. Keep going!',
+        'category': 'motivation'
+    },
+    {
+        'tip': 'Notice any patterns? Share your PancrePal reports with your diabetes team.',
+        'category': 'collaboration'
+    },
+    {
+        'tip': 'Exercise can affect glucose for hours. Log your workouts in the notes field!',
+        'category': 'exercise'
+    },
+    {
+        'tip': 'Morning readings help establish your baseline glucose levels.',
+        'category': 'timing'
+    },
+    {
+        'tip': 'Stress affects blood glucose. Try some deep breathing when levels spike.',
+        'category': 'stress'
+    },
+    {
+        'tip': 'Celebrate small wins! Every log entry is a step toward better management.',
+        'category': 'motivation'
+    },
+    {
+        'tip': 'Your time-in-range percentage is the most important metric. Aim for 70%+!',
+        'category': 'metrics'
+    },
+)
 
 
 def get_daily_tip() -> dict:
     """
-    Get a random daily tip for the dashboard.
+    Get the daily tip for the dashboard.
+
+    A tip is picked at random per date, seeded by the date so every worker
+    process shows the same one, and reused for every request that day.
 
     Returns:
         Dictionary with tip text and category
     """
-    tips = [
-        {
-            'tip': 'Try logging at the same times each day to spot patterns more easily.',
-            'category': 'consistency'
-        },
-        {
-            'tip': 'Tracking your mood helps identify emotional triggers for high or low glucose.',
-            'category': 'mood'
-        },
-        {
-            'tip': 'Logging carbs alongside glucose can reveal how different foods affect you.',
-            'category': 'carbs'
-        },
-        {
-            'tip': 'Small consistent habits matter more than perfect readings. Keep going!',
-            'category': 'motivation'
-        },
-        {
-            'tip': 'Notice any patterns? Share your PancrePal reports with your diabetes team.',
-            'category': 'collaboration'
-        },
-        {
-            'tip': 'Exercise can affect glucose for hours. Log your workouts in the notes field!',
-            'category': 'exercise'
-        },
-        {
-            'tip': 'Morning readings help establish your baseline glucose levels.',
-            'category': 'timing'
-        },
-        {
-            'tip': 'Stress affects blood glucose. Try some deep breathing when levels spike.',
-            'category': 'stress'
-        },
-        {
-            'tip': 'Celebrate small wins! Every log entry is a step toward better management.',
-            'category': 'motivation'
-        },
-        {
-            'tip': 'Your time-in-range percentage is the most important metric. Aim for 70%+!',
-            'category': 'metrics'
-        }
-    ]
+    return _tip_for_day(date.today())
+
 
-    return random.choice(tips)
+@lru_cache(maxsize=1)
+def _tip_for_day(day: date) -> dict:
+    """Pick the tip for ``day``; the single cache slot rolls over daily."""
+    return random.Random(day.toordinal()).choice(DAILY_TIPS)
 
 
 def should_show_reminder(user_id: int) -> dict:
@@ -146,7 +175,7 @@ def should_show_reminder(user_id: int) -> dict:
     Returns:
         Dictionary with reminder info or None
     """
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
+    progress = _get_progress(user_id)
 
     if not progress or not progress.last_log_date:
         return None
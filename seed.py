@@ -11,6 +11,7 @@ Warning: This will DELETE all existing data and create fresh test data.
 from app import app, db
 from db import User, LogEntry, UserProgress
 from datetime import datetime, timedelta
+from itertools import accumulate
 import random
 import sys
 
@@ -151,11 +152,15 @@ def generate_carb_amount(meal_type):
     return random.randint(min_carbs, max_carbs)
 
 
+MOODS = ('happy', 'calm', 'stressed', 'tired', 'frustrated')
+MOOD_WEIGHTS = (0.35, 0.30, 0.15, 0.12, 0.08)  # Bias toward positive
+# Running totals, so random.choices bisects directly instead of summing per call
+MOOD_CUM_WEIGHTS = tuple(accumulate(MOOD_WEIGHTS))
+
+
 def generate_mood():
     """Generate realistic mood distribution."""
-    moods = ['happy', 'calm', 'stressed', 'tired', 'frustrated']
-    weights = [0.35, 0.30, 0.15, 0.12, 0.08]  # Bias toward positive
-    return random.choices(moods, weights=weights)[0]
+    return random.choices(MOODS, cum_weights=MOOD_CUM_WEIGHTS)[0]
 
 
 def generate_notes(meal_type, glucose, carbs):
@@ -200,8 +205,6 @@ def create_log_entries(user_id):
             start_date = end_date - timedelta(days=NUM_DAYS)
 
             current_date = start_date
-            total_entries = 0
-            batch_size = 50  # Commit every 50 entries
 
             print(f"   Generating entries from {start_date.date()} to {end_date.date()}...")
 
@@ -233,43 +236,37 @@ def create_log_entries(user_id):
                     mood = generate_mood()
                     notes = generate_notes(meal_type, glucose, carbs)
 
-                    # Create entry
-                    entry = LogEntry(
-                        user_id=user_id,
-                        timestamp=timestamp,
-                        blood_glucose=glucose,
-                        meal_type=meal_type,
-                        mood=mood,
-                        notes=notes,
-                        carbs_grams=carbs  # US-22
-                    )
-                    db.session.add(entry)
-                    total_entries += 1
-
-                    # Commit in batches
-                    if total_entries % batch_size == 0:
-                        db.session.commit()
-                        print(f"   ... {total_entries} entries created")
+                    # Plain row dict for the batched insert below
+                    entries.append({
+                        'user_id': user_id,
+                        'timestamp': timestamp,
+                        'blood_glucose': glucose,
+                        'meal_type': meal_type,
+                        'mood': mood,
+                        'notes': notes,
+                        'carbs_grams': carbs,  # US-22
+                    })
 
                 # Move to next day
                 current_date += timedelta(days=1)
 
-            # Final commit
-            db.session.commit()
-            print(f"   ✓ All entries committed to database")
+            total_entries = len(entries)
+
+            # One Core executemany INSERT, committed with the progress update
+            db.session.execute(LogEntry.__table__.insert(), entries)
 
             # Update user progress
             progress = UserProgress.query.filter_by(user_id=user_id).first()
             if progress:
                 progress.total_logs = total_entries
-                db.session.commit()
+
+            db.session.commit()
+            print(f"   ✓ All entries committed to database")
+            if progress:
                 print(f"   ✓ Updated user progress")
 
-            # Calculate carb tracking statistics
-            entries_with_carbs = LogEntry.query.filter(
-                LogEntry.user_id == user_id,
-                LogEntry.carbs_grams.isnot(None)
-            ).count()
+            # Calculate carb tracking statistics from the rows just inserted
+            entries_with_carbs = sum(1 for e in entries if e['carbs_grams'] is not None)
 
             carb_tracking_pct = (entries_with_carbs / total_entries * 100) if total_entries > 0 else 0
 
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+import flask
+
+# app.py's relative sqlite:///pancrepal.db resolves inside the app's instance
+# folder. Point that at a throwaway directory so the tests never touch the
+# checked-in instance/pancrepal.db.
+_instance_path = tempfile.mkdtemp()
+flask.Flask.auto_find_instance_path = lambda self: _instance_path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from analytics import analyze_weekly_trend, calculate_advanced_metrics
+
+
+def make_entries(readings):
+    start = datetime(2026, 3, 2, 8, 0)
+    return [
+        SimpleNamespace(
+            timestamp=start + timedelta(hours=6 * i),
+            blood_glucose=glucose,
+            carbs_grams=None,
+            meal_type='lunch',
+            mood='calm',
+            notes=None,
+        )
+        for i, glucose in enumerate(readings)
+    ]
+
+
+# Readings whose exact mean is an x.x5 tie; the expected values are what the
+# original statistics.mean() implementation displayed. A running (Welford)
+# mean or a plain float sum rounds the other way on these.
+@pytest.mark.parametrize('readings, mean_glucose', [
+    ([4.9, 12.2, 13.6, 6.7], 9.3),
+    ([3.6, 4.2, 9.5, 6.2, 4.3, 6.1], 5.7),
+    ([4.5, 6.8, 11.7, 12.4, 9.9, 8.4], 8.9),
+    ([7.7, 12.6, 8.8, 4.7], 8.4),
+])
+def test_mean_glucose_matches_original_at_rounding_ties(readings, mean_glucose):
+    entries = make_entries(readings)
+    assert calculate_advanced_metrics(entries)['mean_glucose'] == mean_glucose
+    assert analyze_weekly_trend(entries)['avg_glucose'] == mean_glucose
+
+
+def test_metrics_pinned_to_original_output():
+    metrics = calculate_advanced_metrics(make_entries([4.9, 12.2, 13.6, 6.7]))
+    assert metrics['std_dev'] == 4.2
+    assert metrics['coefficient_of_variation'] == 45.0
+    assert metrics['time_in_range_pct'] == 50.0
+    assert metrics['time_above_range_pct'] == 50.0
+    assert metrics['status'] == 'good'
+
+
+# Readings whose exact standard deviation is an x.x5 tie; the expected values
+# are what the original statistics.stdev() implementation displayed.
+@pytest.mark.parametrize('readings, std_dev', [
+    ([8.8, 6.1, 14.2, 16.4], 4.7),
+    ([20.0, 16.1, 18.1, 13.1], 3.0),
+])
+def test_std_dev_matches_original_at_rounding_ties(readings, std_dev):
+    assert calculate_advanced_metrics(make_entries(readings))['std_dev'] == std_dev
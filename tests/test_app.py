@@ -0,0 +1,115 @@
+import csv
+import gzip
+import io
+import json
+from itertools import count
+
+import pytest
+
+from app import app, COMPRESS_MIN_SIZE
+from exports import CSV_HEADER
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+_user_ids = count()
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def log_reading(client, glucose=6.5):
+    return client.post('/log', data={
+        'glucose_level': str(glucose),
+        'meal_type': 'lunch',
+        'mood': 'calm',
+        'notes': 'Test entry with a short note',
+        'carbs_grams': '45',
+    })
+
+
+@pytest.fixture
+def user_client(client):
+    """A client logged in as a fresh account with 20 entries."""
+    password = 'password123'
+    client.post('/register', data={
+        'email': f'user{next(_user_ids)}@example.com',
+        'password': password,
+        'password_confirm': password,
+    })
+    for i in range(20):
+        log_reading(client, 5.0 + i / 4)
+    return client
+
+
+def test_unknown_url_returns_404_page(client):
+    response = client.get('/nonexistent')
+    assert response.status_code == 404
+    assert b'Page Not Found' in response.data
+
+
+def test_json_responses_are_gzipped(user_client):
+    response = user_client.get('/api/entries', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert len(json.loads(gzip.decompress(response.data))) == 20
+
+
+def test_html_responses_are_gzipped(client):
+    response = client.get('/login', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert b'</html>' in gzip.decompress(response.data)
+
+
+def test_streamed_csv_export_is_gzipped(user_client):
+    response = user_client.get('/export/csv', headers=GZIP)
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert rows[0] == CSV_HEADER
+    assert len(rows) == 21
+    assert all(len(row) == len(CSV_HEADER) for row in rows)
+
+
+def test_small_bodies_are_not_compressed(user_client):
+    response = user_client.get('/api/progress', headers=GZIP)
+    assert len(response.data) < COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['total_logs'] == 20
+
+
+def test_no_compression_without_accept_encoding(user_client):
+    response = user_client.get('/api/entries')
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_json()) == 20
+
+
+@pytest.mark.parametrize('url', ['/api/entries', '/api/progress', '/api/metrics'])
+def test_unchanged_api_resource_returns_304(user_client, url):
+    etag = user_client.get(url).headers['ETag']
+    response = user_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+@pytest.mark.parametrize('url', ['/api/entries', '/api/progress', '/api/metrics'])
+def test_api_etag_changes_after_logging(user_client, url):
+    etag = user_client.get(url).headers['ETag']
+    log_reading(user_client, 12.0)
+    response = user_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('url', ['/api/entries', '/api/progress', '/api/metrics'])
+def test_api_responses_must_revalidate(user_client, url):
+    response = user_client.get(url)
+    not_modified = user_client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    for r in (response, not_modified):
+        assert r.cache_control.private
+        assert r.cache_control.no_cache